@@ -115,6 +115,8 @@ def interactive_mode(client: OllamaClient, execute: bool = False, yes: bool = Fa
             logger.debug(f"Failed to set up readline history: {e}")
 
     sanitizer = InputSanitizer()
+    # Created on first use and reused across turns so repeated queries hit its cache
+    query_evaluator = None
     # Maintain conversation history for context
     conversation_history: list[Dict[str, str]] = []
     
@@ -207,8 +209,9 @@ def interactive_mode(client: OllamaClient, execute: bool = False, yes: bool = Fa
                         logger.debug(f"Query: {prompt}")
                         logger.debug(f"Current working directory: {cwd}")
                         logger.debug("=" * 80)
-                    use_ollama = os.getenv("CLA_USE_OLLAMA_STRATEGY", "true").lower() == "true"
-                    query_evaluator = QueryEvaluator(use_ollama=use_ollama, ollama_client=client)
+                    if query_evaluator is None:
+                        use_ollama = os.getenv("CLA_USE_OLLAMA_STRATEGY", "true").lower() == "true"
+                        query_evaluator = QueryEvaluator(use_ollama=use_ollama, ollama_client=client)
                     query_context = query_evaluator.evaluate_query(prompt, cwd)
                     
                     # Build prompt builder for context collection
@@ -984,7 +987,7 @@ def process_query_with_execution(
             if relevant_patterns:
                 patterns_context = "\n\n**Similar successful patterns from past experience:**\n"
                 for pattern in relevant_patterns:
-                    patterns_context += f"- Query: \"{pattern['query']}\" used: `{pattern['command']}`\n"
+                    patterns_context += f"- Query: \"{pattern.query}\" used: `{pattern.command}`\n"
             
             context_query = f"""{current_query}{patterns_context}
 
@@ -2,9 +2,11 @@
 
 import json
 import logging
+import threading
 from typing import Optional, Iterator, Dict, Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from command_line_assistant.config import Config
 from command_line_assistant.exceptions import (
@@ -13,6 +15,30 @@ from command_line_assistant.exceptions import (
 )
 from command_line_assistant.logger import get_logger, is_debug_mode
 
+# HTTP session shared by all clients in the process, so connections to Ollama
+# are kept alive and reused instead of reconnecting for every request
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Get the shared HTTP session, creating it on first use.
+
+    Returns:
+        requests.Session with a small connection pool.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
@@ -80,7 +106,7 @@ class OllamaClient:
                 self.logger.debug("PROMPT:")
                 self.logger.debug(prompt)
                 self.logger.debug("=" * 80)
-            response = requests.post(
+            response = _get_session().post(
                 self.endpoint,
                 json=payload,
                 timeout=timeout,
@@ -304,7 +330,7 @@ class OllamaClient:
                     self.logger.debug(content)
                     self.logger.debug("-" * 40)
                 self.logger.debug("=" * 80)
-            response = requests.post(
+            response = _get_session().post(
                 chat_endpoint,
                 json=payload,
                 timeout=timeout,
@@ -1,37 +1,85 @@
 """System prompt builder with self-learning capabilities."""
 
-from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from collections import Counter, OrderedDict, deque, namedtuple
+from functools import cached_property
+from itertools import islice
+from typing import List, Dict, Optional, Set
 from pathlib import Path
+import atexit
+import heapq
 import json
+import logging
+import mmap
+import os
+import sys
+import threading
 
 from command_line_assistant.platform_detector import PlatformDetector
-from command_line_assistant.logger import get_logger, is_debug_mode
+from command_line_assistant.logger import get_logger
 
+# Use orjson for learning data if available (faster encode/decode)
+try:
+    import orjson
+    USE_ORJSON = True
+except ImportError:
+    USE_ORJSON = False
+    orjson = None
 
-class PromptSectionStrategy(ABC):
-    """Abstract base class for prompt section building strategies."""
-    
-    @abstractmethod
-    def build_section(self, context: Dict) -> str:
-        """
-        Build a section of the prompt.
-        
-        Args:
-            context: Dictionary containing context needed for building the section.
-            
-        Returns:
-            The section string to be included in the prompt.
-        """
-        pass
+# Below this size reading a file is cheaper than setting up a memory map
+MMAP_MIN_BYTES = 64 * 1024
 
 
-class CorePromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building core prompt sections (OS restrictions, response format, etc.)."""
-    
-    def build_section(self, context: Dict) -> str:
-        """Build the core prompt sections."""
-        return """You are a Linux Bash Automation Agent. You must respond using structured JSON format that matches the required schema.
+# A learned query -> command pattern. tokens holds the query's significant
+# words for matching and is not persisted.
+Pattern = namedtuple("Pattern", "query command context tokens")
+
+
+def _json_loads(data: bytes) -> Dict:
+    """Decode learning data JSON."""
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Dict) -> bytes:
+    """Encode learning data as indented JSON."""
+    if USE_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _read_json_file(f) -> Dict:
+    """
+    Decode JSON from an open binary file.
+
+    Large files are memory-mapped and parsed in place when orjson is available;
+    the standard json module needs a bytes copy, so it always reads normally.
+    """
+    if USE_ORJSON and os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+    return _json_loads(f.read())
+
+
+def _json_dumps_line(data: Dict) -> bytes:
+    """Encode a learning log event as one compact line of JSON."""
+    if USE_ORJSON:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _query_tokens(query: str) -> frozenset:
+    """Return the set of significant (longer than 3 characters) words in a query."""
+    return frozenset(word for word in query.lower().split() if len(word) > 3)
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the set of 3-character substrings of a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+_CORE_SECTION = """You are a Linux Bash Automation Agent. You must respond using structured JSON format that matches the required schema.
 
 **CRITICAL - LANGUAGE REQUIREMENT:**
 ⚠️ **YOU MUST ALWAYS REPLY IN THE SYSTEM LANGUAGE** ⚠️
@@ -117,105 +165,99 @@ After command execution, you receive stdout/stderr and return code:
 • **IMPORTANT:** When you see files mentioned in command output (like README.md), you MUST read them with commands like `cat README.md` to answer questions about the project"""
 
 
-class SudoPromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building sudo-related prompt sections."""
-    
-    def build_section(self, context: Dict) -> str:
-        """Build the sudo-related sections."""
-        allow_sudo = context.get("allow_sudo", False)
-        sudo_status = "ENABLED" if allow_sudo else "DISABLED"
-        sudo_note = (
-            "Sudo commands are **ENABLED**. Use `sudo` when root privileges are needed."
-            if allow_sudo
-            else "Sudo commands are **DISABLED** for security. Do NOT use `sudo`. If a command requires root privileges, you MUST ask the user to enable sudo first."
-        )
-        
-        sudo_instructions = (
-            ""
-            if allow_sudo
-            else "\n\n**IMPORTANT - SUDO REQUESTS:**\n"
-            "If a command requires root/administrator privileges and sudo is disabled:\n"
-            "1. **DO NOT** execute the command without sudo\n"
-            "2. **DO NOT** try to work around it\n"
-            "3. **INFORM THE USER** that sudo is required and explain how to enable it:\n"
-            "   - The user can run the command again with the `--sudo` or `--allow-sudo` flag\n"
-            "   - Example: `cla --execute --sudo \"install nginx\"`\n"
-            "   - Or in interactive mode: `cla --interactive --execute --sudo`\n"
-            "4. **EXPLAIN** what the command would do and why sudo is needed\n"
-            "5. **WAIT** for the user to re-run with sudo enabled before proceeding"
-        )
-        
-        platform_detector = context.get("platform_detector")
-        if not platform_detector:
-            platform_detector = PlatformDetector()
-        
-        platform_info = platform_detector.get_platform_info()
-        platform_name = platform_info["distribution"]
-        commands = platform_info["commands"]
-        package_manager = commands.get("package_manager", "apt")
-        service_manager = commands.get("service_manager", "systemctl")
-        firewall = commands.get("firewall", "ufw")
-        network = commands.get("network", "nmcli")
-        
-        return f"""**SYSTEM SETTINGS:**
+def _core_section(context: Dict) -> str:
+    """Build the core section (OS restrictions, response format, etc.)."""
+    return _CORE_SECTION
+
+
+# Section templates are built once at import time; rendering only selects the
+# allow_sudo dependent fragments and fills in platform commands.
+_SUDO_SECTION_TEMPLATE = """**SYSTEM SETTINGS:**
 • Sudo: {sudo_status} - {sudo_note}{sudo_instructions}
 • Platform: {platform_name} (detected automatically)
 • Commands: Use `{package_manager}` for packages, `{service_manager}` for services, `{firewall}` for firewall, `{network}` for network"""
 
-
-
-
-class LearningPromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building learning context sections."""
+_SUDO_ENABLED_NOTE = "Sudo commands are **ENABLED**. Use `sudo` when root privileges are needed."
+
+_SUDO_DISABLED_NOTE = (
+    "Sudo commands are **DISABLED** for security. Do NOT use `sudo`. "
+    "If a command requires root privileges, you MUST ask the user to enable sudo first."
+)
+
+_SUDO_DISABLED_INSTRUCTIONS = (
+    "\n\n**IMPORTANT - SUDO REQUESTS:**\n"
+    "If a command requires root/administrator privileges and sudo is disabled:\n"
+    "1. **DO NOT** execute the command without sudo\n"
+    "2. **DO NOT** try to work around it\n"
+    "3. **INFORM THE USER** that sudo is required and explain how to enable it:\n"
+    "   - The user can run the command again with the `--sudo` or `--allow-sudo` flag\n"
+    "   - Example: `cla --execute --sudo \"install nginx\"`\n"
+    "   - Or in interactive mode: `cla --interactive --execute --sudo`\n"
+    "4. **EXPLAIN** what the command would do and why sudo is needed\n"
+    "5. **WAIT** for the user to re-run with sudo enabled before proceeding"
+)
+
+
+# Commands used in the prompt when the platform does not provide one
+_DEFAULT_COMMANDS = {
+    "package_manager": "apt",
+    "service_manager": "systemctl",
+    "firewall": "ufw",
+    "network": "nmcli",
+}
+
+
+def _platform_fields(context: Dict) -> Dict:
+    """Return the platform command fields for section templates, with defaults filled in."""
+    return {**_DEFAULT_COMMANDS, **context["platform_info"]["commands"]}
+
+
+def _sudo_section(context: Dict) -> str:
+    """Build the sudo and platform settings section."""
+    allow_sudo = context.get("allow_sudo", False)
+    fields = _platform_fields(context)
+    fields.update(
+        sudo_status="ENABLED" if allow_sudo else "DISABLED",
+        sudo_note=_SUDO_ENABLED_NOTE if allow_sudo else _SUDO_DISABLED_NOTE,
+        sudo_instructions="" if allow_sudo else _SUDO_DISABLED_INSTRUCTIONS,
+        platform_name=context["platform_info"]["distribution"],
+    )
+    return _SUDO_SECTION_TEMPLATE.format_map(fields)
+
+
+def _learning_section(context: Dict) -> str:
+    """Build the learned patterns section."""
+    learning_data = context.get("learning_data", {})
     
-    def build_section(self, context: Dict) -> str:
-        """Build the learning context sections."""
-        learning_data = context.get("learning_data", {})
-        
-        learning_context = ""
-        if learning_data.get("successful_patterns"):
-            recent_patterns = learning_data["successful_patterns"][-3:]
-            learning_context = "\n**LEARNED PATTERNS (use similar approaches when appropriate):**\n"
-            for i, pattern in enumerate(recent_patterns, 1):
-                learning_context += f"{i}. Query: \"{pattern['query']}\" → Command: `{pattern['command']}`\n"
-        
-        return learning_context
+    learning_context = ""
+    patterns = learning_data.get("successful_patterns")
+    if patterns:
+        # Take the last three from the end of the deque rather than skipping
+        # over everything before them
+        recent_patterns = reversed(list(islice(reversed(patterns), 3)))
+        learning_context = "\n**LEARNED PATTERNS (use similar approaches when appropriate):**\n"
+        for i, pattern in enumerate(recent_patterns, 1):
+            learning_context += f"{i}. Query: \"{pattern.query}\" → Command: `{pattern.command}`\n"
+    
+    return learning_context
 
 
-class EnvironmentPromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building environment context sections."""
+def _environment_section(context: Dict) -> str:
+    """Build the learned environment context section."""
+    learning_data = context.get("learning_data", {})
     
-    def build_section(self, context: Dict) -> str:
-        """Build the environment context sections."""
-        learning_data = context.get("learning_data", {})
-        
-        environment_context = ""
-        if learning_data.get("environment_context"):
-            env_data = learning_data["environment_context"]
-            if env_data:
-                environment_context = "\n**ENVIRONMENT CONTEXT (learned from previous sessions):**\n"
-                for key, value in env_data.items():
-                    if value:  # Only include non-empty values
-                        environment_context += f"• {key}: {value}\n"
-        
-        return environment_context
+    environment_context = ""
+    env_data = learning_data.get("environment_context")
+    if env_data:
+        environment_context = "\n**ENVIRONMENT CONTEXT (learned from previous sessions):**\n"
+        for key, value in env_data.items():
+            if value:  # Only include non-empty values
+                environment_context += f"• {key}: {value}\n"
+    
+    return environment_context
 
 
-class ExamplesPromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building examples section."""
-    
-    def build_section(self, context: Dict) -> str:
-        """Build the examples section."""
-        allow_sudo = context.get("allow_sudo", False)
-        platform_detector = context.get("platform_detector")
-        if not platform_detector:
-            platform_detector = PlatformDetector()
-        
-        platform_info = platform_detector.get_platform_info()
-        commands = platform_info["commands"]
-        package_manager = commands.get("package_manager", "apt")
-        
-        return f"""**EXAMPLES:**
+_EXAMPLES_SECTION_TEMPLATE = """**EXAMPLES:**
 
 ❌ **WRONG - DO NOT DO THIS:**
 User: "what is the total size of all files here"
@@ -267,20 +309,7 @@ You: {{
 }}
 
 User: "Install nginx"
-{f'''You: {{
-  "thinking": "Installing nginx with {package_manager}.",
-  "commands": [
-    {{
-      "description": "Install nginx package",
-      "command": "sudo {package_manager} install -y nginx"
-    }}
-  ],
-  "task_complete": false
-}}''' if allow_sudo else f'''You: {{
-  "thinking": "Installing nginx requires root privileges. Sudo is currently disabled. To enable sudo, please run the command again with the --sudo flag: `cla --execute --sudo \\"install nginx\\"` or in interactive mode: `cla --interactive --execute --sudo`. This will install nginx system-wide using {package_manager}.",
-  "commands": [],
-  "task_complete": false
-}}'''}
+{install_example}
 
 User: "Delete all files"
 You: {{
@@ -302,13 +331,34 @@ You: {{
 }}
 (Then analyze output and ask for clarification or check README if it's a project)"""
 
+_INSTALL_EXAMPLE_SUDO = """You: {{
+  "thinking": "Installing nginx with {package_manager}.",
+  "commands": [
+    {{
+      "description": "Install nginx package",
+      "command": "sudo {package_manager} install -y nginx"
+    }}
+  ],
+  "task_complete": false
+}}"""
 
-class RememberPromptSectionStrategy(PromptSectionStrategy):
-    """Strategy for building the remember section."""
-    
-    def build_section(self, context: Dict) -> str:
-        """Build the remember section."""
-        return """**REMEMBER:**
+_INSTALL_EXAMPLE_NO_SUDO = """You: {{
+  "thinking": "Installing nginx requires root privileges. Sudo is currently disabled. To enable sudo, please run the command again with the --sudo flag: `cla --execute --sudo \\"install nginx\\"` or in interactive mode: `cla --interactive --execute --sudo`. This will install nginx system-wide using {package_manager}.",
+  "commands": [],
+  "task_complete": false
+}}"""
+
+
+def _examples_section(context: Dict) -> str:
+    """Build the examples section."""
+    allow_sudo = context.get("allow_sudo", False)
+    install_example = _INSTALL_EXAMPLE_SUDO if allow_sudo else _INSTALL_EXAMPLE_NO_SUDO
+    return _EXAMPLES_SECTION_TEMPLATE.format_map(
+        {"install_example": install_example.format_map(_platform_fields(context))}
+    )
+
+
+_REMEMBER_SECTION = """**REMEMBER:**
 • **CRITICAL:** This is Linux only - NEVER provide Windows, macOS, or other OS commands
 • **ALWAYS use structured JSON format** with "thinking", "commands", and "task_complete" fields
 • **NEVER use code blocks** (```bash) - use the structured format instead
@@ -320,38 +370,177 @@ class RememberPromptSectionStrategy(PromptSectionStrategy):
 • **ONLY Linux/bash commands** - no exceptions"""
 
 
+def _remember_section(context: Dict) -> str:
+    """Build the remember section."""
+    return _REMEMBER_SECTION
+
+
 class PromptBuilder:
     """Builds and optimizes system prompts with self-learning."""
 
+    # Section builders, in prompt order; each takes the build context dict and
+    # returns "" when it has nothing to add
+    _SECTIONS = (
+        _core_section,
+        _sudo_section,
+        _environment_section,
+        _learning_section,
+        _examples_section,
+        _remember_section,
+    )
+
+    # Consecutive sections rendered from learning data; every other section
+    # depends only on allow_sudo and the platform
+    _LEARNED_SECTIONS = (_environment_section, _learning_section)
+
+    # Number of recent successful patterns kept in learning data
+    MAX_SUCCESSFUL_PATTERNS = 50
+
+    # Number of recent solutions kept per known error
+    MAX_ERROR_SOLUTIONS = 5
+
+    # Number of known errors kept; the least recently used are evicted first
+    MAX_ERROR_KEYS = 200
+
+    # Context snippets shorter than this are interned and shared between patterns
+    INTERN_CONTEXT_LENGTH = 64
+
+    # Changes are appended to a log next to the learning file; once it holds more
+    # than this many events they are folded into the learning file itself
+    COMPACT_LOG_LINES = 500
+
+    # Seconds a background write waits after the first change; changes made in
+    # the meantime are written together
+    SAVE_DELAY_SECONDS = 1.0
+
+    # Learning events that change the rendered system prompt; error solutions
+    # are not part of it
+    _PROMPT_EVENT_KINDS = frozenset(("pattern", "environment"))
+
     def __init__(self, learning_file: Optional[Path] = None, platform_detector: Optional[PlatformDetector] = None):
         """
         Initialize prompt builder.
 
         Args:
             learning_file: Path to learning data file (stores successful patterns).
-            platform_detector: Platform detector instance. If None, creates a new one.
+                           Changes since it was last written are kept in a
+                           log with the same name and an .ndjson suffix.
+            platform_detector: Platform detector instance. If None, one is created
+                               the first time platform information is needed.
         """
         if learning_file is None:
             learning_file = Path.home() / ".config" / "command-line-assistant" / "learning.json"
         self.learning_file = learning_file
-        self.platform_detector = platform_detector or PlatformDetector()
+        self.learning_log = learning_file.with_suffix(".ndjson")
+        self._platform_detector = platform_detector
         self.logger = get_logger(f"{__name__}.PromptBuilder")
+        # Events recorded but not yet appended to the log
+        self._pending_events: List[tuple] = []
+        # Sequence number of the last recorded event. Log events carry their
+        # number and the learning file the number of the last event folded into
+        # it, so events left in the log by an interrupted compaction are skipped.
+        self._log_seq = 0
+        self._save_timer: Optional[threading.Timer] = None
+        # _lock guards learning_data against the background writer; _write_lock
+        # keeps writes to the file in order
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        # Rendered prompts keyed by allow_sudo, and the learned sections shared by
+        # both; cleared whenever a learning event in _PROMPT_EVENT_KINDS is recorded
+        self._rendered_prompts: Dict[bool, str] = {}
+        self._learned_text: Optional[str] = None
+
+        # Trigram index over error_solutions keys, built on first lookup
+        self._error_index: Optional[Dict[str, Set[str]]] = None
+        self._error_trigram_counts: Dict[str, int] = {}
+        self._short_error_keys: Set[str] = set()
+        # Increasing numbers in error_solutions order, renumbered on each use
+        self._error_order: Dict[str, int] = {}
+        self._errors_indexed = 0
+
+        # Inverted index from query token to the sequence numbers of the patterns
+        # containing it (oldest first), built on first lookup. Pattern number n
+        # is at successful_patterns[n - (patterns_added - len(successful_patterns))].
+        self._pattern_index: Optional[Dict[str, deque]] = None
+        self._patterns_added = 0
+
         self.learning_data = self._load_learning_data()
-        
-        # Initialize strategies
-        self.core_strategy = CorePromptSectionStrategy()
-        self.sudo_strategy = SudoPromptSectionStrategy()
-        self.learning_strategy = LearningPromptSectionStrategy()
-        self.environment_strategy = EnvironmentPromptSectionStrategy()
-        self.examples_strategy = ExamplesPromptSectionStrategy()
-        self.remember_strategy = RememberPromptSectionStrategy()
+        self._patterns_added = len(self.learning_data["successful_patterns"])
+        self._log_lines = self._replay_learning_log()
+
+    @cached_property
+    def platform_detector(self) -> PlatformDetector:
+        """Platform detector, created on first use if none was given."""
+        return self._platform_detector or PlatformDetector()
+
+    @cached_property
+    def _platform_info(self) -> Dict:
+        """Platform information, detected once per builder and reused by every prompt."""
+        return self.platform_detector.get_platform_info()
+
+    def refresh_platform(self) -> None:
+        """Detect platform information again on the next prompt build (e.g. in long-running processes)."""
+        self.__dict__.pop("_platform_info", None)
+        self.__dict__.pop("_prompt_variants", None)
+        self._rendered_prompts.clear()
+
+    @cached_property
+    def _prompt_variants(self) -> Dict[bool, tuple]:
+        """
+        Platform-specialized prompt text before and after the learned sections.
+
+        Everything outside _LEARNED_SECTIONS is fixed for a given allow_sudo and
+        platform, so both variants are rendered once and only the learned
+        sections are spliced in between when a prompt is built.
+
+        Returns:
+            (head, tail) strings keyed by allow_sudo.
+        """
+        start = self._SECTIONS.index(self._LEARNED_SECTIONS[0])
+        end = start + len(self._LEARNED_SECTIONS)
+        variants = {}
+        for allow_sudo in (False, True):
+            context = {"allow_sudo": allow_sudo, "platform_info": self._platform_info}
+            head = [build_section(context) for build_section in self._SECTIONS[:start]]
+            tail = [build_section(context) for build_section in self._SECTIONS[end:]]
+            variants[allow_sudo] = (
+                "\n\n".join(section for section in head if section),
+                "\n\n".join(section for section in tail if section),
+            )
+        return variants
 
     def _load_learning_data(self) -> Dict:
         """Load learning data from file."""
+        # Make sure deferred changes from other builders are on disk first
+        _flush_dirty_builders(self.learning_file)
         if self.learning_file.exists():
             try:
-                with open(self.learning_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.learning_file, 'rb') as f:
+                    data = _read_json_file(f)
+                    # Token sets are not persisted; rebuild them for matching
+                    data["successful_patterns"] = deque(
+                        (
+                            self._make_pattern(
+                                pattern.get("query", ""),
+                                pattern.get("command", ""),
+                                pattern.get("context", ""),
+                            )
+                            for pattern in data.get("successful_patterns", [])
+                        ),
+                        maxlen=self.MAX_SUCCESSFUL_PATTERNS,
+                    )
+                    # Keep only the most recently used errors, oldest first
+                    error_solutions = data.get("error_solutions", {})
+                    data["error_solutions"] = OrderedDict(
+                        (error, deque(solutions, maxlen=self.MAX_ERROR_SOLUTIONS))
+                        for error, solutions in islice(
+                            error_solutions.items(),
+                            max(len(error_solutions) - self.MAX_ERROR_KEYS, 0),
+                            None,
+                        )
+                    )
+                    self._log_seq = data.pop("log_seq", 0)
                     self.logger.debug(f"Loaded learning data from {self.learning_file}")
                     return data
             except json.JSONDecodeError as e:
@@ -362,69 +551,321 @@ class PromptBuilder:
                 return self._default_learning_data()
         return self._default_learning_data()
 
+    def _replay_learning_log(self) -> int:
+        """
+        Apply events from the learning log on top of the loaded learning data.
+
+        Returns:
+            Number of events in the log.
+        """
+        if not self.learning_log.exists():
+            return 0
+        folded_seq = self._log_seq
+        lines = 0
+        try:
+            with open(self.learning_log, 'rb') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        event = _json_loads(line)
+                        seq = event.get("n")
+                        if seq is not None:
+                            if seq <= folded_seq:
+                                # Already part of the learning file
+                                continue
+                            self._log_seq = max(self._log_seq, seq)
+                        self._apply_event(event["k"], event["p"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        # e.g. a partial last line from an interrupted write
+                        self.logger.warning(f"Skipping invalid learning log entry: {e}")
+            self.logger.debug(f"Replayed {lines} learning log events from {self.learning_log}")
+        except Exception as e:
+            self.logger.warning(f"Failed to read learning log: {e}")
+        return lines
+
     def _default_learning_data(self) -> Dict:
         """Return default learning data structure."""
         return {
-            "successful_patterns": [],
-            "error_solutions": {},
+            "successful_patterns": deque(maxlen=self.MAX_SUCCESSFUL_PATTERNS),
+            "error_solutions": OrderedDict(),
             "environment_context": {},
             "user_preferences": {},
         }
 
     def _save_learning_data(self) -> None:
-        """Save learning data to file."""
-        self.learning_file.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            with open(self.learning_file, 'w') as f:
-                json.dump(self.learning_data, f, indent=2)
-            self.logger.debug(f"Saved learning data to {self.learning_file}")
-        except Exception as e:
-            self.logger.warning(f"Failed to save learning data: {e}")
+        """
+        Schedule pending learning data changes to be saved to file.
 
-    def record_success(self, query: str, command: str, output: str) -> None:
-        """Record a successful command pattern."""
-        pattern = {
-            "query": query.lower(),
-            "command": command,
-            "context": output[:200] if output else "",  # Store context snippet
+        Writes happen off the caller's path: a background timer appends the
+        pending events SAVE_DELAY_SECONDS later, together with any other events
+        recorded in the meantime. Pending events are also written by
+        flush_learning_data() and at interpreter exit.
+        """
+        with self._lock:
+            _dirty_builders.add(self)
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.SAVE_DELAY_SECONDS, self.flush_learning_data)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush_learning_data(self) -> None:
+        """
+        Write pending learning data changes to file.
+
+        New events are appended to the learning log in a single write. When the
+        log grows past COMPACT_LOG_LINES, the full learning data is written to
+        the learning file instead and the log is removed.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._pending_events:
+                    return
+                events, self._pending_events = self._pending_events, []
+                _dirty_builders.discard(self)
+                self._log_lines += len(events)
+                compact = self._log_lines > self.COMPACT_LOG_LINES
+                if compact:
+                    data = self._snapshot_learning_data()
+                    self._log_lines = 0
+            try:
+                self.learning_file.parent.mkdir(parents=True, exist_ok=True)
+                if compact:
+                    self._compact(data)
+                else:
+                    with open(self.learning_log, 'ab') as f:
+                        f.write(b"".join(
+                            _json_dumps_line({"n": seq, "k": kind, "p": payload}) for seq, kind, payload in events
+                        ))
+                    self.logger.debug(f"Appended {len(events)} events to {self.learning_log}")
+            except Exception as e:
+                self.logger.warning(f"Failed to save learning data: {e}")
+
+    def _compact(self, data: Dict) -> None:
+        """Write the full learning data to the learning file and drop the log."""
+        # Write to a temporary file and swap it in so readers never see a partial file
+        tmp_file = self.learning_file.with_suffix(".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp_file, self.learning_file)
+        # If this never happens, the next load skips the logged events by their
+        # sequence numbers, which the learning file's log_seq covers
+        if self.learning_log.exists():
+            self.learning_log.unlink()
+        self.logger.debug(f"Saved learning data to {self.learning_file}")
+
+    def _snapshot_learning_data(self) -> Dict:
+        """Copy learning data into plain JSON-serializable structures for writing."""
+        data = dict(self.learning_data)
+        data["successful_patterns"] = [
+            {"query": pattern.query, "command": pattern.command, "context": pattern.context}
+            for pattern in data["successful_patterns"]
+        ]
+        data["error_solutions"] = {
+            error: list(solutions) for error, solutions in data["error_solutions"].items()
         }
-        # Keep only recent successful patterns (last 50)
-        self.learning_data["successful_patterns"].append(pattern)
-        if len(self.learning_data["successful_patterns"]) > 50:
-            self.learning_data["successful_patterns"] = self.learning_data["successful_patterns"][-50:]
+        data["environment_context"] = dict(data.get("environment_context") or {})
+        data["log_seq"] = self._log_seq
+        return data
+
+    def _record(self, kind: str, payload: Dict) -> None:
+        """Apply a learning event and queue it to be appended to the log."""
+        with self._lock:
+            self._apply_event(kind, payload)
+            self._log_seq += 1
+            self._pending_events.append((self._log_seq, kind, payload))
+        if kind in self._PROMPT_EVENT_KINDS:
+            self._rendered_prompts.clear()
+            self._learned_text = None
         self._save_learning_data()
 
+    def _apply_event(self, kind: str, payload: Dict) -> None:
+        """
+        Apply a learning event to the in-memory learning data.
+
+        Args:
+            kind: Event type: "pattern", "error", "error_used" or "environment".
+            payload: Event fields.
+        """
+        if kind == "pattern":
+            patterns = self.learning_data["successful_patterns"]
+            pattern = self._make_pattern(payload["query"], payload["command"], payload["context"])
+            if self._pattern_index is not None:
+                if len(patterns) == patterns.maxlen:
+                    self._unindex_pattern(patterns[0])
+                self._index_pattern(pattern, self._patterns_added)
+            # Bounded deque keeps only the most recent patterns
+            patterns.append(pattern)
+            self._patterns_added += 1
+        elif kind == "error":
+            error_key = payload["error"]
+            error_solutions = self.learning_data["error_solutions"]
+            if error_key in error_solutions:
+                self._mark_error_used(error_key)
+            else:
+                # Bounded deque keeps only the most recent solutions
+                error_solutions[error_key] = deque(maxlen=self.MAX_ERROR_SOLUTIONS)
+                if self._error_index is not None:
+                    self._index_error_key(error_key)
+                # Evict the least recently used errors
+                while len(error_solutions) > self.MAX_ERROR_KEYS:
+                    evicted, _ = error_solutions.popitem(last=False)
+                    if self._error_index is not None:
+                        self._unindex_error_key(evicted)
+            solutions = error_solutions[error_key]
+            if payload["solution"] not in solutions:
+                solutions.append(payload["solution"])
+        elif kind == "error_used":
+            # The error may have been evicted since the lookup
+            if payload["error"] in self.learning_data["error_solutions"]:
+                self._mark_error_used(payload["error"])
+        elif kind == "environment":
+            if not self.learning_data.get("environment_context"):
+                self.learning_data["environment_context"] = {}
+            self.learning_data["environment_context"][payload["key"]] = payload["value"]
+        else:
+            self.logger.debug(f"Ignoring unknown learning event: {kind}")
+
+    def _make_pattern(self, query: str, command: str, context: str) -> Pattern:
+        """Create a pattern, deriving its match tokens from the query."""
+        if len(context) < self.INTERN_CONTEXT_LENGTH:
+            # Short snippets (e.g. "OK", "active") repeat across patterns
+            context = sys.intern(context)
+        return Pattern(query=query, command=command, context=context, tokens=_query_tokens(query))
+
+    def record_success(self, query: str, command: str, output: str) -> None:
+        """Record a successful command pattern."""
+        # Store a short context snippet; slice before stripping so large outputs
+        # are never copied whole
+        context = output[:200].strip() if output else ""
+        self._record("pattern", {"query": query.lower(), "command": command, "context": context})
+
     def record_error_solution(self, error_pattern: str, solution: str) -> None:
         """Record an error and its solution."""
         error_key = error_pattern.lower()[:100]  # Normalize and truncate
-        if error_key not in self.learning_data["error_solutions"]:
-            self.learning_data["error_solutions"][error_key] = []
-        solutions = self.learning_data["error_solutions"][error_key]
-        if solution not in solutions:
-            solutions.append(solution)
-            # Keep only recent solutions (last 5 per error)
-            if len(solutions) > 5:
-                solutions[:] = solutions[-5:]
-        self._save_learning_data()
+        self._record("error", {"error": error_key, "solution": solution})
 
-    def get_relevant_patterns(self, query: str, limit: int = 3) -> List[Dict]:
+    def get_relevant_patterns(self, query: str, limit: int = 3) -> List[Pattern]:
         """Get relevant successful patterns for a query."""
-        query_lower = query.lower()
-        relevant = []
-        for pattern in reversed(self.learning_data["successful_patterns"]):  # Most recent first
-            if any(word in pattern["query"] for word in query_lower.split() if len(word) > 3):
-                relevant.append(pattern)
-                if len(relevant) >= limit:
-                    break
-        return relevant
+        query_tokens = _query_tokens(query)
+        if not query_tokens:
+            return []
+        index = self._get_pattern_index()
+        matches = set()
+        for token in query_tokens:
+            matches.update(index.get(token, ()))
+        if not matches:
+            return []
+        # Most recent (highest sequence number) first
+        patterns = self.learning_data["successful_patterns"]
+        first = self._patterns_added - len(patterns)
+        return [patterns[number - first] for number in heapq.nlargest(limit, matches)]
+
+    def _get_pattern_index(self) -> Dict[str, deque]:
+        """Return the token index over successful patterns, building it if needed."""
+        if self._pattern_index is None:
+            self._pattern_index = {}
+            patterns = self.learning_data["successful_patterns"]
+            first = self._patterns_added - len(patterns)
+            for offset, pattern in enumerate(patterns):
+                self._index_pattern(pattern, first + offset)
+        return self._pattern_index
+
+    def _index_pattern(self, pattern: Pattern, number: int) -> None:
+        """Add a pattern's tokens to the index."""
+        for token in pattern.tokens:
+            self._pattern_index.setdefault(token, deque()).append(number)
+
+    def _unindex_pattern(self, pattern: Pattern) -> None:
+        """Remove the oldest pattern from the index; it is first in each of its tokens' entries."""
+        for token in pattern.tokens:
+            numbers = self._pattern_index[token]
+            numbers.popleft()
+            if not numbers:
+                del self._pattern_index[token]
 
     def get_error_solution(self, error_text: str) -> Optional[str]:
         """Get a known solution for an error pattern."""
         error_key = error_text.lower()[:100]
-        for known_error, solutions in self.learning_data["error_solutions"].items():
-            if known_error in error_key or error_key in known_error:
-                return solutions[-1] if solutions else None
-        return None
+        error_solutions = self.learning_data["error_solutions"]
+        index = self._get_error_index()
+
+        if len(error_key) < 3:
+            # Too short to have trigrams; check every known error directly
+            candidates = error_solutions.keys()
+        else:
+            # A substring match in either direction means every trigram of the
+            # shorter string occurs in the longer one, so only keys that share
+            # all of their own trigrams, or all of the error's, can match.
+            error_trigrams = _trigrams(error_key)
+            hits = Counter()
+            for trigram in error_trigrams:
+                hits.update(index.get(trigram, ()))
+            candidates = [
+                known_error
+                for known_error, count in hits.items()
+                if count == len(error_trigrams) or count == self._error_trigram_counts[known_error]
+            ]
+            candidates.extend(self._short_error_keys)
+
+        matches = [k for k in candidates if k in error_key or error_key in k]
+        if not matches:
+            return None
+        # Prefer the most recently used error, so repeated lookups stay on the
+        # same one
+        known_error = max(matches, key=self._error_order.__getitem__)
+        if known_error != next(reversed(error_solutions)):
+            with self._lock:
+                self._mark_error_used(known_error)
+                # Queued without scheduling a write; it goes to the log with the
+                # next change that does, so the order survives a reload
+                self._log_seq += 1
+                self._pending_events.append((self._log_seq, "error_used", {"error": known_error}))
+        solutions = error_solutions[known_error]
+        return solutions[-1] if solutions else None
+
+    def _mark_error_used(self, error_key: str) -> None:
+        """Move a known error to the most recently used end."""
+        self.learning_data["error_solutions"].move_to_end(error_key)
+        if self._error_index is not None:
+            self._error_order[error_key] = self._errors_indexed
+            self._errors_indexed += 1
+
+    def _get_error_index(self) -> Dict[str, Set[str]]:
+        """Return the trigram index over known errors, building it if needed."""
+        if self._error_index is None:
+            self._error_index = {}
+            self._error_trigram_counts = {}
+            self._short_error_keys = set()
+            self._error_order = {}
+            self._errors_indexed = 0
+            for known_error in self.learning_data["error_solutions"]:
+                self._index_error_key(known_error)
+        return self._error_index
+
+    def _index_error_key(self, error_key: str) -> None:
+        """Add a known error key to the trigram index."""
+        trigrams = _trigrams(error_key)
+        for trigram in trigrams:
+            self._error_index.setdefault(trigram, set()).add(error_key)
+        self._error_trigram_counts[error_key] = len(trigrams)
+        if not trigrams:
+            self._short_error_keys.add(error_key)
+        self._error_order[error_key] = self._errors_indexed
+        self._errors_indexed += 1
+
+    def _unindex_error_key(self, error_key: str) -> None:
+        """Remove an evicted error key from the trigram index."""
+        for trigram in _trigrams(error_key):
+            keys = self._error_index[trigram]
+            keys.discard(error_key)
+            if not keys:
+                del self._error_index[trigram]
+        del self._error_trigram_counts[error_key]
+        self._short_error_keys.discard(error_key)
+        del self._error_order[error_key]
 
     def record_environment_context(self, key: str, value: str) -> None:
         """
@@ -434,10 +875,7 @@ class PromptBuilder:
             key: The context key (e.g., "default_editor", "preferred_shell", "project_type").
             value: The context value.
         """
-        if not self.learning_data.get("environment_context"):
-            self.learning_data["environment_context"] = {}
-        self.learning_data["environment_context"][key] = value
-        self._save_learning_data()
+        self._record("environment", {"key": key, "value": value})
         self.logger.debug(f"Recorded environment context: {key}={value}")
 
     def get_environment_context(self, key: str) -> Optional[str]:
@@ -462,40 +900,81 @@ class PromptBuilder:
         Returns:
             Optimized system prompt.
         """
-        if is_debug_mode():
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
             self.logger.debug("=" * 80)
             self.logger.debug("BUILDING SYSTEM PROMPT")
             self.logger.debug("=" * 80)
-            self.logger.debug(f"Allow sudo: {allow_sudo}")
-            self.logger.debug(f"Learning data available: {bool(self.learning_data)}")
+            self.logger.debug("Allow sudo: %s", allow_sudo)
+            self.logger.debug("Learning data available: %s", bool(self.learning_data))
             if self.learning_data.get("successful_patterns"):
-                self.logger.debug(f"Successful patterns: {len(self.learning_data['successful_patterns'])}")
+                self.logger.debug("Successful patterns: %d", len(self.learning_data["successful_patterns"]))
             if self.learning_data.get("environment_context"):
-                self.logger.debug(f"Environment context keys: {list(self.learning_data['environment_context'].keys())}")
+                self.logger.debug("Environment context keys: %s", list(self.learning_data["environment_context"]))
             self.logger.debug("=" * 80)
         
-        # Build context for strategies
-        context = {
-            "allow_sudo": allow_sudo,
-            "platform_detector": self.platform_detector,
-            "learning_data": self.learning_data,
-        }
+        allow_sudo = bool(allow_sudo)
+        prompt = self._rendered_prompts.get(allow_sudo)
+        if prompt is None:
+            prompt = self._render_system_prompt(allow_sudo)
+            self._rendered_prompts[allow_sudo] = prompt
         
-        # Use strategies to build different sections
-        sections = [
-            self.core_strategy.build_section(context),
-            self.sudo_strategy.build_section(context),
-            self.environment_strategy.build_section(context),
-            self.learning_strategy.build_section(context),
-            self.examples_strategy.build_section(context),
-            self.remember_strategy.build_section(context),
-        ]
-        
-        # Combine all sections
-        prompt = "\n\n".join(section for section in sections if section.strip())
-        
-        if is_debug_mode():
-            self.logger.debug(f"System prompt built: {len(prompt)} characters")
+        if debug:
+            self.logger.debug("System prompt built: %d characters", len(prompt))
             self.logger.debug("=" * 80)
         
         return prompt
+
+    def _render_system_prompt(self, allow_sudo: bool) -> str:
+        """
+        Render the system prompt by splicing the learned sections into the
+        platform-specialized variant for allow_sudo.
+
+        Args:
+            allow_sudo: Whether sudo commands are allowed.
+
+        Returns:
+            Rendered system prompt.
+        """
+        head, tail = self._prompt_variants[allow_sudo]
+        if self._learned_text is None:
+            self._learned_text = self._render_learned_sections()
+
+        # Combine all non-empty parts
+        return "\n\n".join(part for part in (head, self._learned_text, tail) if part)
+
+    def _render_learned_sections(self) -> str:
+        """Render the sections built from learning data."""
+        context = {"learning_data": self.learning_data}
+
+        # Learned sections are empty until something has been recorded (e.g. first
+        # run), so skip calling them at all in that case
+        skipped = set()
+        if not self.learning_data.get("successful_patterns"):
+            skipped.add(_learning_section)
+        if not self.learning_data.get("environment_context"):
+            skipped.add(_environment_section)
+
+        sections = [
+            build_section(context) for build_section in self._LEARNED_SECTIONS if build_section not in skipped
+        ]
+        return "\n\n".join(section for section in sections if section)
+
+
+# Builders with learning data changes that have not been written yet
+_dirty_builders: Set[PromptBuilder] = set()
+
+
+def _flush_dirty_builders(learning_file: Optional[Path] = None) -> None:
+    """
+    Write deferred learning data changes.
+
+    Args:
+        learning_file: Only flush builders using this file. If None, flushes all.
+    """
+    for builder in list(_dirty_builders):
+        if learning_file is None or builder.learning_file == learning_file:
+            builder.flush_learning_data()
+
+
+atexit.register(_flush_dirty_builders)
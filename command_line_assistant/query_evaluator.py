@@ -3,13 +3,20 @@
 Uses Strategy pattern to allow different evaluation strategies.
 """
 
+import logging
+import os
 import re
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple, Union
 
-from command_line_assistant.logger import get_logger, is_debug_mode
+from command_line_assistant.logger import get_logger
+
+# Separator line for debug output
+_BANNER = "=" * 80
 
 
 @dataclass
@@ -20,16 +27,39 @@ class QueryContext:
     query_type: str
 
 
+@dataclass(frozen=True)
+class PreparedQuery:
+    """A user query with its derived forms, computed once and shared by all strategies."""
+    raw: str
+    lower: str
+
+    @classmethod
+    def from_query(cls, query: Union[str, "PreparedQuery"]) -> "PreparedQuery":
+        """
+        Prepare a query for evaluation.
+
+        Args:
+            query: The user query, or an already prepared query (returned as is).
+
+        Returns:
+            PreparedQuery for the query.
+        """
+        if isinstance(query, PreparedQuery):
+            return query
+        return cls(raw=query, lower=query.lower())
+
+
 class EvaluationStrategy(ABC):
     """Abstract base class for query evaluation strategies."""
 
     @abstractmethod
-    def evaluate(self, query: str, cwd: Path) -> Optional[QueryContext]:
+    def evaluate(self, query: Union[PreparedQuery, str], cwd: Path) -> Optional[QueryContext]:
         """
         Evaluate a query using this strategy.
 
         Args:
-            query: The user query to evaluate.
+            query: The prepared user query to evaluate. Plain strings are
+                   accepted too and prepared with PreparedQuery.from_query().
             cwd: Current working directory.
 
         Returns:
@@ -41,26 +71,36 @@ class EvaluationStrategy(ABC):
 class PathDetectionStrategy(EvaluationStrategy):
     """Strategy that detects explicit paths in queries."""
 
-    # Path patterns (absolute and relative)
+    # Path patterns (absolute and relative); the surrounding whitespace is only
+    # looked at, not consumed, so matches need no trimming and adjacent paths
+    # are all found
     PATH_PATTERN = re.compile(
-        r'(?:^|\s)(?:'
+        r'(?:^|(?<=\s))(?:'
         r'/[^\s]+'  # Absolute paths starting with /
         r'|\.\.?/[^\s]+'  # Relative paths with ./ or ../
         r'|~/[^\s]+'  # Home directory paths
         r'|[A-Z]:\\[^\s]+'  # Windows paths
-        r')(?:\s|$)'
+        r')(?=\s|$)'
     )
 
-    def __init__(self):
-        """Initialize path detection strategy."""
+    def __init__(self, resolve_symlinks: bool = False):
+        """
+        Initialize path detection strategy.
+
+        Args:
+            resolve_symlinks: Resolve symlinks in detected paths. By default paths
+                              are only made absolute and normalized.
+        """
         self.logger = get_logger(f"{__name__}.PathDetectionStrategy")
+        self.resolve_symlinks = resolve_symlinks
 
-    def evaluate(self, query: str, cwd: Path) -> Optional[QueryContext]:
+    def evaluate(self, query: Union[PreparedQuery, str], cwd: Path) -> Optional[QueryContext]:
         """Evaluate query for explicit paths."""
-        target_path = self._extract_path(query, cwd)
+        query = PreparedQuery.from_query(query)
+        target_path = self._extract_path(query.raw, cwd)
         
         if target_path:
-            self.logger.debug(f"Path detected: {target_path}")
+            self.logger.debug("Path detected: %s", target_path)
             return QueryContext(
                 needs_local_context=True,
                 target_path=target_path,
@@ -69,37 +109,24 @@ class PathDetectionStrategy(EvaluationStrategy):
         return None
 
     def _extract_path(self, query: str, cwd: Path) -> Optional[Path]:
-        """Extract path from query if present."""
-        matches = self.PATH_PATTERN.findall(query)
-        if not matches:
-            return None
-
-        for match in matches:
-            path_str = match.strip()
-            path_str = re.sub(r'^["\']|["\']$', '', path_str)
-            path_str = path_str.strip()
+        """
+        Extract the first path in the query.
 
-            if not path_str:
-                continue
+        Every PATH_PATTERN match contains a separator, so matches are taken as
+        paths without checking that they exist.
+        """
+        for match in self.PATH_PATTERN.findall(query):
+            path_str = match.strip('"\'')
 
             try:
-                if path_str.startswith('~'):
-                    path = Path(path_str).expanduser()
-                else:
-                    path = Path(path_str)
-
-                if not path.is_absolute():
-                    path = (cwd / path).resolve()
-                else:
-                    path = path.resolve()
-
-                if path.exists():
-                    return path
-                if '/' in path_str or '\\' in path_str:
-                    return path
+                # join() keeps absolute paths as they are
+                path = os.path.join(cwd, os.path.expanduser(path_str))
+                if self.resolve_symlinks:
+                    return Path(os.path.realpath(path))
+                return Path(os.path.normpath(path))
 
             except (ValueError, OSError) as e:
-                self.logger.debug(f"Failed to parse path '{path_str}': {e}")
+                self.logger.debug("Failed to parse path '%s': %s", path_str, e)
                 continue
 
         return None
@@ -108,22 +135,25 @@ class PathDetectionStrategy(EvaluationStrategy):
 class KeywordDetectionStrategy(EvaluationStrategy):
     """Strategy that detects project-related keywords in queries."""
 
-    # Keywords that suggest local context is needed
-    LOCAL_CONTEXT_KEYWORDS = [
+    # Keywords that suggest local context is needed (deduplicated, in order)
+    LOCAL_CONTEXT_KEYWORDS = tuple(dict.fromkeys([
         "project", "directory", "folder", "file", "code", "repository",
-        "repo", "codebase", "workspace", "workspace", "source", "src",
+        "repo", "codebase", "workspace", "source", "src",
         "module", "package", "component", "structure", "tree",
         "language", "programming", "framework", "library", "dependencies"
-    ]
+    ]))
+
+    # Keywords as one alternation so a query is scanned once, not once per keyword
+    LOCAL_CONTEXT_PATTERN = re.compile("|".join(map(re.escape, LOCAL_CONTEXT_KEYWORDS)))
 
     def __init__(self):
         """Initialize keyword detection strategy."""
         self.logger = get_logger(f"{__name__}.KeywordDetectionStrategy")
 
-    def evaluate(self, query: str, cwd: Path) -> Optional[QueryContext]:
+    def evaluate(self, query: Union[PreparedQuery, str], cwd: Path) -> Optional[QueryContext]:
         """Evaluate query for project-related keywords."""
-        query_lower = query.lower().strip()
-        has_keywords = any(keyword in query_lower for keyword in self.LOCAL_CONTEXT_KEYWORDS)
+        query = PreparedQuery.from_query(query)
+        has_keywords = self.LOCAL_CONTEXT_PATTERN.search(query.lower) is not None
 
         if has_keywords:
             self.logger.debug("Project-related keywords detected")
@@ -151,18 +181,20 @@ class PatternDetectionStrategy(EvaluationStrategy):
         r"what\s+technology",
     ]
 
+    # All patterns fused into one expression so a query is scanned once
+    PROJECT_QUESTION_PATTERN = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in PROJECT_QUESTION_PATTERNS),
+        re.IGNORECASE,
+    )
+
     def __init__(self):
         """Initialize pattern detection strategy."""
         self.logger = get_logger(f"{__name__}.PatternDetectionStrategy")
 
-    def evaluate(self, query: str, cwd: Path) -> Optional[QueryContext]:
+    def evaluate(self, query: Union[PreparedQuery, str], cwd: Path) -> Optional[QueryContext]:
         """Evaluate query for project-related question patterns."""
-        query_lower = query.lower().strip()
-        
-        has_project_question = any(
-            re.search(pattern, query_lower, re.IGNORECASE)
-            for pattern in self.PROJECT_QUESTION_PATTERNS
-        )
+        query = PreparedQuery.from_query(query)
+        has_project_question = self.PROJECT_QUESTION_PATTERN.search(query.lower) is not None
 
         if has_project_question:
             self.logger.debug("Project-related question pattern detected")
@@ -174,9 +206,28 @@ class PatternDetectionStrategy(EvaluationStrategy):
         return None
 
 
+# Client for selectors created without one; built once and shared
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def _get_default_client():
+    """Get the shared default OllamaClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                from command_line_assistant.client import OllamaClient
+                _default_client = OllamaClient()
+    return _default_client
+
+
 class OllamaStrategySelector(EvaluationStrategy):
     """Strategy that uses Ollama AI to select the best evaluation strategy."""
 
+    # Number of recent (query, cwd) selections kept
+    CACHE_SIZE = 128
+
     def __init__(self, ollama_client=None):
         """
         Initialize Ollama strategy selector.
@@ -186,34 +237,63 @@ class OllamaStrategySelector(EvaluationStrategy):
         """
         self.logger = get_logger(f"{__name__}.OllamaStrategySelector")
         self.ollama_client = ollama_client
+        self._cache: "OrderedDict[Tuple[str, str], Optional[QueryContext]]" = OrderedDict()
         self._fallback_strategies = {
-            "path_detection": PathDetectionStrategy(),
-            "pattern_detection": PatternDetectionStrategy(),
-            "keyword_detection": KeywordDetectionStrategy(),
+            "path_detection": PathDetectionStrategy.INSTANCE,
+            "pattern_detection": PatternDetectionStrategy.INSTANCE,
+            "keyword_detection": KeywordDetectionStrategy.INSTANCE,
         }
 
     def _get_client(self):
-        """Get or create Ollama client."""
+        """Get the Ollama client, falling back to the shared default client."""
         if self.ollama_client is None:
-            from command_line_assistant.client import OllamaClient
-            self.ollama_client = OllamaClient()
+            self.ollama_client = _get_default_client()
         return self.ollama_client
 
-    def evaluate(self, query: str, cwd: Path) -> Optional[QueryContext]:
-        """Use Ollama to select the best strategy and evaluate."""
+    def evaluate(self, query: Union[PreparedQuery, str], cwd: Path) -> Optional[QueryContext]:
+        """Use Ollama to select the best strategy and evaluate.
+
+        Results are cached per (query, cwd), so repeating a query in the same
+        directory does not ask Ollama again. Failed selections are not cached.
+        """
+        query = PreparedQuery.from_query(query)
+        key = (query.lower.strip(), str(cwd))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.logger.debug("Using cached Ollama strategy selection")
+            return self._cache[key]
+
         try:
-            if is_debug_mode():
-                self.logger.debug("=" * 80)
-                self.logger.debug("QUERY EVALUATION: Using Ollama strategy selector")
-                self.logger.debug("=" * 80)
-                self.logger.debug(f"Query: {query}")
-                self.logger.debug(f"Current working directory: {cwd}")
-                self.logger.debug("Reason: Determining if query needs local file/project context")
-                self.logger.debug("=" * 80)
-            client = self._get_client()
-            from command_line_assistant.schemas import get_strategy_selection_schema
-
-            system_prompt = """You are a query analysis assistant. Analyze user queries to determine if they need local file/project context.
+            result = self._select_strategy(query, cwd)
+        except Exception as e:
+            # If Ollama fails, fall back to traditional strategies
+            self.logger.warning(f"Ollama strategy selection failed: {e}, falling back to traditional strategies")
+            return None
+
+        self._cache[key] = result
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear_cache(self) -> None:
+        """Forget cached strategy selections."""
+        self._cache.clear()
+
+    def _select_strategy(self, query: PreparedQuery, cwd: Path) -> Optional[QueryContext]:
+        """Ask Ollama to select a strategy and build the resulting context."""
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(_BANNER)
+            self.logger.debug("QUERY EVALUATION: Using Ollama strategy selector")
+            self.logger.debug(_BANNER)
+            self.logger.debug("Query: %s", query.raw)
+            self.logger.debug("Current working directory: %s", cwd)
+            self.logger.debug("Reason: Determining if query needs local file/project context")
+            self.logger.debug(_BANNER)
+        client = self._get_client()
+        from command_line_assistant.schemas import get_strategy_selection_schema
+
+        system_prompt = """You are a query analysis assistant. Analyze user queries to determine if they need local file/project context.
 
 Available strategies:
 - path_detection: Use when query contains explicit file/directory paths (e.g., "/home/user/project", "./src", "~/myfile")
@@ -223,67 +303,62 @@ Available strategies:
 
 Analyze the query and select the most appropriate strategy. If a path is detected, extract it."""
 
-            user_prompt = f"""Analyze this query and determine which evaluation strategy to use:
+        user_prompt = f"""Analyze this query and determine which evaluation strategy to use:
 
-Query: "{query}"
+Query: "{query.raw}"
 Current working directory: {cwd}
 
 Select the best strategy and provide the evaluation result."""
 
-            schema = get_strategy_selection_schema()
-            response = client.generate_structured(
-                user_prompt=user_prompt,
-                system_prompt=system_prompt,
-                format_schema=schema,
-                stream=False
-            )
-            
-            if is_debug_mode():
-                self.logger.debug("Ollama strategy selection response received")
+        schema = get_strategy_selection_schema()
+        response = client.generate_structured(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            format_schema=schema,
+            stream=False
+        )
+        
+        if debug:
+            self.logger.debug("Ollama strategy selection response received")
 
-            selected_strategy = response.get("selected_strategy", "none")
-            needs_local_context = response.get("needs_local_context", False)
-            target_path_str = response.get("target_path")
-            query_type = response.get("query_type", "general")
+        selected_strategy = response.get("selected_strategy", "none")
+        needs_local_context = response.get("needs_local_context", False)
+        target_path_str = response.get("target_path")
+        query_type = response.get("query_type", "general")
 
-            self.logger.debug(
-                f"Ollama selected strategy: {selected_strategy}, "
-                f"needs_context={needs_local_context}, reasoning={response.get('reasoning', '')}"
-            )
+        self.logger.debug(
+            "Ollama selected strategy: %s, needs_context=%s, reasoning=%s",
+            selected_strategy, needs_local_context, response.get("reasoning", ""),
+        )
 
-            # If Ollama says no context needed, return None
-            if not needs_local_context or selected_strategy == "none":
-                return None
+        # If Ollama says no context needed, return None
+        if not needs_local_context or selected_strategy == "none":
+            return None
 
-            # Parse target path if provided
-            target_path = None
-            if target_path_str:
-                try:
-                    target_path = Path(target_path_str)
-                    if not target_path.is_absolute():
-                        target_path = (cwd / target_path).resolve()
-                    else:
-                        target_path = target_path.resolve()
-                except (ValueError, OSError) as e:
-                    self.logger.debug(f"Failed to parse target path '{target_path_str}': {e}")
-                    # Fall back to using the selected strategy
-                    if selected_strategy in self._fallback_strategies:
-                        return self._fallback_strategies[selected_strategy].evaluate(query, cwd)
-
-            # If no target path but context needed, use cwd
-            if target_path is None:
-                target_path = cwd
+        # Parse target path if provided
+        target_path = None
+        if target_path_str:
+            try:
+                target_path = Path(target_path_str)
+                if not target_path.is_absolute():
+                    target_path = (cwd / target_path).resolve()
+                else:
+                    target_path = target_path.resolve()
+            except (ValueError, OSError) as e:
+                self.logger.debug("Failed to parse target path '%s': %s", target_path_str, e)
+                # Fall back to using the selected strategy
+                if selected_strategy in self._fallback_strategies:
+                    return self._fallback_strategies[selected_strategy].evaluate(query, cwd)
 
-            return QueryContext(
-                needs_local_context=needs_local_context,
-                target_path=target_path,
-                query_type=query_type
-            )
+        # If no target path but context needed, use cwd
+        if target_path is None:
+            target_path = cwd
 
-        except Exception as e:
-            # If Ollama fails, fall back to traditional strategies
-            self.logger.warning(f"Ollama strategy selection failed: {e}, falling back to traditional strategies")
-            return None
+        return QueryContext(
+            needs_local_context=needs_local_context,
+            target_path=target_path,
+            query_type=query_type
+        )
 
 
 class QueryEvaluator:
@@ -308,21 +383,20 @@ class QueryEvaluator:
         
         # Default strategies if none provided
         if strategies is None:
-            self.strategies = []
+            # Cheap deterministic strategies first, so obvious queries never
+            # wait for a model round trip
+            self.strategies = [
+                PathDetectionStrategy.INSTANCE,
+                PatternDetectionStrategy.INSTANCE,
+                KeywordDetectionStrategy.INSTANCE,
+            ]
             
-            # Add Ollama strategy first if enabled
+            # Add Ollama strategy last, for queries none of the above match
             if use_ollama:
                 try:
                     self.strategies.append(OllamaStrategySelector(ollama_client))
                 except Exception as e:
                     self.logger.warning(f"Failed to initialize Ollama strategy: {e}, using traditional strategies only")
-            
-            # Add traditional strategies as fallback
-            self.strategies.extend([
-                PathDetectionStrategy(),
-                PatternDetectionStrategy(),
-                KeywordDetectionStrategy(),
-            ])
         else:
             self.strategies = strategies
 
@@ -342,42 +416,45 @@ class QueryEvaluator:
             QueryContext with evaluation results.
         """
         if cwd is None:
-            import os
             cwd = Path(os.getcwd())
 
-        if is_debug_mode():
-            self.logger.debug("=" * 80)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(_BANNER)
             self.logger.debug("QUERY EVALUATION: Starting evaluation")
-            self.logger.debug("=" * 80)
-            self.logger.debug(f"Query: {query}")
-            self.logger.debug(f"Current working directory: {cwd}")
-            self.logger.debug(f"Number of strategies: {len(self.strategies)}")
-            for i, strategy in enumerate(self.strategies):
-                self.logger.debug(f"  Strategy {i+1}: {strategy.__class__.__name__}")
-            self.logger.debug("=" * 80)
+            self.logger.debug(_BANNER)
+            self.logger.debug("Query: %s", query)
+            self.logger.debug("Current working directory: %s", cwd)
+            self.logger.debug("Number of strategies: %d", len(self.strategies))
+            for i, strategy in enumerate(self.strategies, 1):
+                self.logger.debug("  Strategy %d: %s", i, strategy.__class__.__name__)
+            self.logger.debug(_BANNER)
+
+        # Lowercase/split the query once for all strategies
+        prepared = PreparedQuery.from_query(query)
 
         # Try each strategy in order
         for strategy in self.strategies:
-            if is_debug_mode():
-                self.logger.debug(f"Trying strategy: {strategy.__class__.__name__}")
-            result = strategy.evaluate(query, cwd)
+            if debug:
+                self.logger.debug("Trying strategy: %s", strategy.__class__.__name__)
+            result = strategy.evaluate(prepared, cwd)
             if result and result.needs_local_context:
-                self.logger.debug(
-                    f"Strategy {strategy.__class__.__name__} determined context is needed: "
-                    f"target_path={result.target_path}, type={result.query_type}"
-                )
-                if is_debug_mode():
-                    self.logger.debug("=" * 80)
+                if debug:
+                    self.logger.debug(
+                        "Strategy %s determined context is needed: target_path=%s, type=%s",
+                        strategy.__class__.__name__, result.target_path, result.query_type,
+                    )
+                    self.logger.debug(_BANNER)
                     self.logger.debug("QUERY EVALUATION: Context needed")
-                    self.logger.debug("=" * 80)
+                    self.logger.debug(_BANNER)
                 return result
 
         # No strategy matched - no local context needed
-        self.logger.debug("No strategy determined that local context is needed")
-        if is_debug_mode():
-            self.logger.debug("=" * 80)
+        if debug:
+            self.logger.debug("No strategy determined that local context is needed")
+            self.logger.debug(_BANNER)
             self.logger.debug("QUERY EVALUATION: No local context needed")
-            self.logger.debug("=" * 80)
+            self.logger.debug(_BANNER)
         return QueryContext(
             needs_local_context=False,
             target_path=None,
@@ -403,3 +480,10 @@ class QueryEvaluator:
         """
         self.strategies = [s for s in self.strategies if not isinstance(s, strategy_type)]
         self.logger.debug(f"Removed strategy: {strategy_type.__name__}")
+
+
+# The detection strategies hold no per-query state, so one shared instance of
+# each serves every evaluator
+PathDetectionStrategy.INSTANCE = PathDetectionStrategy()
+PatternDetectionStrategy.INSTANCE = PatternDetectionStrategy()
+KeywordDetectionStrategy.INSTANCE = KeywordDetectionStrategy()
@@ -1,12 +1,77 @@
 """Input sanitization and validation for command-line-assistant."""
 
+import os
 import re
 import html
 from typing import Optional
-from pathlib import Path
 
 from command_line_assistant.logger import get_logger
 
+# Use RE2 for dangerous-pattern scanning if available (linear time, no backtracking)
+try:
+    import re2
+    USE_RE2 = True
+except ImportError:
+    USE_RE2 = False
+    re2 = None
+
+# Control characters to remove, as str.translate tables and as patterns for
+# non-ASCII text; commands and AI responses keep tabs, newlines and carriage returns
+_CONTROL_CHARS = dict.fromkeys([*range(0x00, 0x20), *range(0x7f, 0xa0)])
+_COMMAND_CONTROL_CHARS = dict.fromkeys(c for c in _CONTROL_CHARS if c not in (0x09, 0x0a, 0x0d))
+_CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+_COMMAND_CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]')
+
+# Patterns used on every call are compiled once at import
+_WHITESPACE = re.compile(r'\s+')
+_LINE_WHITESPACE = re.compile(r'[ \t]+')
+_LINE_EDGES = re.compile(r'[^\S\n]*\n[^\S\n]*')  # Whitespace around a newline
+
+# Dangerous patterns that should be blocked; sanitize_query only scans
+# queries containing "<", ":" or "=", so every pattern must need one of them
+_DANGEROUS_PATTERNS = (
+    r'<script\b[^>]*>(.*?)</script>',  # Script tags
+    r'javascript:',  # JavaScript protocol
+    r'on\w+\s*=',  # Event handlers (onclick, onerror, etc.)
+    r'data:text/html',  # Data URLs with HTML
+    r'vbscript:',  # VBScript protocol
+)
+
+# All dangerous patterns in one alternation, so a query is scanned once; the
+# group named p<i> tells which of _DANGEROUS_PATTERNS matched
+_DANGEROUS_PATTERN = (re2 if USE_RE2 else re).compile(
+    "(?i)" + "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(_DANGEROUS_PATTERNS))
+)
+
+# Substrings that make a path invalid; plain substring checks, no regex needed
+_DANGEROUS_PATH_PATTERNS = (
+    '../',  # Parent directory traversal
+    '..\\',  # Windows parent directory
+    '//',  # Multiple slashes (potential issues)
+    '~',  # Home directory (could be dangerous)
+)
+
+
+def _strip_control_chars(text: str, keep_whitespace: bool = False) -> str:
+    """
+    Remove control characters from text.
+
+    str.translate is several times faster than a regex substitution on ASCII
+    text, but much slower once it meets a non-ASCII character, so the regex is
+    used for those.
+
+    Args:
+        text: Text to clean.
+        keep_whitespace: Keep tabs, newlines and carriage returns.
+
+    Returns:
+        Text without the control characters.
+    """
+    if text.isascii():
+        return text.translate(_COMMAND_CONTROL_CHARS if keep_whitespace else _CONTROL_CHARS)
+    pattern = _COMMAND_CONTROL_CHARS_PATTERN if keep_whitespace else _CONTROL_CHARS_PATTERN
+    return pattern.sub('', text)
+
 
 class InputSanitizer:
     """Sanitizes and validates user input to prevent security issues."""
@@ -15,21 +80,10 @@ class InputSanitizer:
     MAX_INPUT_LENGTH = 10000
     MAX_COMMAND_LENGTH = 2000
 
-    # Dangerous patterns that should be blocked
-    DANGEROUS_PATTERNS = [
-        r'<script\b[^>]*>(.*?)</script>',  # Script tags
-        r'javascript:',  # JavaScript protocol
-        r'on\w+\s*=',  # Event handlers (onclick, onerror, etc.)
-        r'data:text/html',  # Data URLs with HTML
-        r'vbscript:',  # VBScript protocol
-    ]
-
-    # Control characters that should be removed
-    CONTROL_CHARS = re.compile(r'[\x00-\x1f\x7f-\x9f]')
-
-    def __init__(self):
-        """Initialize input sanitizer."""
-        self.logger = get_logger(f"{__name__}.InputSanitizer")
+    # Sanitizers hold no per-instance state, so every instance shares one logger
+    # and creating a sanitizer costs nothing
+    __slots__ = ()
+    logger = get_logger(f"{__name__}.InputSanitizer")
 
     def sanitize_query(self, query: str) -> str:
         """
@@ -59,17 +113,23 @@ class InputSanitizer:
             raise ValueError("Query cannot be empty")
 
         # Remove control characters
-        query = self.CONTROL_CHARS.sub('', query)
-
-        # Check for dangerous patterns
-        for pattern in self.DANGEROUS_PATTERNS:
-            if re.search(pattern, query, re.IGNORECASE):
+        query = _strip_control_chars(query)
+
+        # Check for dangerous patterns, repeating in case removing one joins the
+        # remaining text into another. Every pattern needs a "<", ":" or "=", so
+        # plain queries skip the scan.
+        while '<' in query or ':' in query or '=' in query:
+            blocked = {match.lastgroup for match in _DANGEROUS_PATTERN.finditer(query)}
+            if not blocked:
+                break
+            for group in sorted(blocked):
+                pattern = _DANGEROUS_PATTERNS[int(group[1:])]
                 self.logger.warning(f"Blocked dangerous pattern in query: {pattern}")
-                # Remove the dangerous content instead of raising error
-                query = re.sub(pattern, '', query, flags=re.IGNORECASE)
+            # Remove the dangerous content instead of raising error
+            query = _DANGEROUS_PATTERN.sub('', query)
 
         # Normalize whitespace (multiple spaces to single)
-        query = re.sub(r'\s+', ' ', query)
+        query = _WHITESPACE.sub(' ', query)
 
         return query.strip()
 
@@ -100,18 +160,15 @@ class InputSanitizer:
         if not command:
             raise ValueError("Command cannot be empty")
 
-        # Remove control characters (except newlines and tabs which might be needed)
-        # Keep \n and \t, remove others
-        command = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', command)
-
-        # Remove null bytes
-        command = command.replace('\x00', '')
+        # Remove control characters, including null bytes (except newlines and
+        # tabs which might be needed). Keep \n and \t, remove others
+        command = _strip_control_chars(command, keep_whitespace=True)
 
         # Normalize whitespace (but preserve intentional spacing)
-        # Replace multiple spaces with single space, but keep newlines
-        lines = command.split('\n')
-        sanitized_lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in lines]
-        command = '\n'.join(sanitized_lines)
+        # Replace multiple spaces with single space, but keep newlines, and strip
+        # each line without splitting the command into lines
+        command = _LINE_WHITESPACE.sub(' ', command)
+        command = _LINE_EDGES.sub('\n', command)
 
         return command.strip()
 
@@ -137,25 +194,18 @@ class InputSanitizer:
             return None
 
         # Remove control characters
-        path = self.CONTROL_CHARS.sub('', path)
+        path = _strip_control_chars(path)
 
         # Block path traversal attempts
-        dangerous_path_patterns = [
-            r'\.\./',  # Parent directory traversal
-            r'\.\.\\',  # Windows parent directory
-            r'//',  # Multiple slashes (potential issues)
-            r'~',  # Home directory (could be dangerous)
-        ]
-
-        for pattern in dangerous_path_patterns:
-            if re.search(pattern, path):
+        for pattern in _DANGEROUS_PATH_PATTERNS:
+            if pattern in path:
                 self.logger.warning(f"Blocked dangerous path pattern: {pattern}")
                 raise ValueError(f"Invalid path: contains dangerous pattern")
 
-        # Normalize path
+        # Normalize path lexically; this is only sanitization, so there is no need
+        # to touch the filesystem to resolve symlinks
         try:
-            normalized = Path(path).resolve()
-            return str(normalized)
+            return os.path.abspath(path)
         except (ValueError, OSError) as e:
             self.logger.warning(f"Invalid path: {e}")
             raise ValueError(f"Invalid path: {e}") from e
@@ -181,10 +231,11 @@ class InputSanitizer:
 
         if value_type == "url":
             # URL validation
-            if not re.match(r'^https?://', value, re.IGNORECASE):
+            # Only the scheme needs lowercasing, not the whole URL
+            if not value[:8].lower().startswith(('http://', 'https://')):
                 raise ValueError("URL must start with http:// or https://")
             # Remove control characters
-            value = self.CONTROL_CHARS.sub('', value)
+            value = _strip_control_chars(value)
         elif value_type == "number":
             # Number validation (for temperature, etc.)
             try:
@@ -193,7 +244,7 @@ class InputSanitizer:
                 raise ValueError(f"Invalid number: {value}")
         else:
             # String value - remove control characters
-            value = self.CONTROL_CHARS.sub('', value)
+            value = _strip_control_chars(value)
 
         return value
 
@@ -210,17 +261,16 @@ class InputSanitizer:
         if not isinstance(response, str):
             return ""
 
-        # Remove null bytes
-        response = response.replace('\x00', '')
-
-        # Remove most control characters (keep newlines and tabs)
-        response = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', response)
-
-        # Limit length
+        # Limit length first, so nothing past the limit is scanned
         if len(response) > self.MAX_INPUT_LENGTH * 2:  # Allow longer for AI responses
-            self.logger.warning(f"AI response truncated: {len(response)} characters")
+            self.logger.warning(
+                f"AI response truncated from {len(response)} to {self.MAX_INPUT_LENGTH * 2} characters"
+            )
             response = response[:self.MAX_INPUT_LENGTH * 2]
 
+        # Remove most control characters, including null bytes (keep newlines and tabs)
+        response = _strip_control_chars(response, keep_whitespace=True)
+
         return response
 
     def validate_json_safe(self, text: str) -> bool:
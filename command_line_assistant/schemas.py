@@ -1,8 +1,10 @@
 """JSON schemas for structured outputs with Ollama."""
 
+from functools import lru_cache
 from typing import Dict, Any
 
 
+@lru_cache(maxsize=None)
 def get_strategy_selection_schema() -> Dict[str, Any]:
     """
     Get JSON schema for strategy selection responses.
@@ -11,7 +13,8 @@ def get_strategy_selection_schema() -> Dict[str, Any]:
     which evaluation strategy to use.
 
     Returns:
-        JSON schema dictionary for structured outputs.
+        JSON schema dictionary for structured outputs. The same dictionary is
+        returned on every call, so callers must not modify it.
 
     Example response:
         {
@@ -53,6 +56,7 @@ def get_strategy_selection_schema() -> Dict[str, Any]:
     }
 
 
+@lru_cache(maxsize=None)
 def get_command_response_schema() -> Dict[str, Any]:
     """
     Get JSON schema for command execution responses.
@@ -61,7 +65,8 @@ def get_command_response_schema() -> Dict[str, Any]:
     The response includes thinking/reasoning, optional array of commands with descriptions, and task status.
 
     Returns:
-        JSON schema dictionary for structured outputs.
+        JSON schema dictionary for structured outputs. The same dictionary is
+        returned on every call, so callers must not modify it.
 
     Example response:
         {
@@ -0,0 +1,100 @@
+"""Shared fixtures for command-line-assistant tests."""
+
+import subprocess
+from unittest.mock import MagicMock
+import pytest
+
+from command_line_assistant.cli import process_query_with_execution
+from command_line_assistant.client import OllamaClient
+from command_line_assistant.platform_detector import PlatformDetector
+
+# Output served by the fake_run fixture, by command
+COMMAND_OUTPUTS = {
+    "df -h": "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1        20G   15G  4.5G  77% /\n",
+}
+
+
+@pytest.fixture(autouse=True)
+def _no_ollama_strategy(monkeypatch):
+    """Disable Ollama strategy selection; tests needing it set the variable back to "true"."""
+    monkeypatch.setenv("CLA_USE_OLLAMA_STRATEGY", "false")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_home(monkeypatch, tmp_path):
+    """Point HOME at a per-test directory so learning data never touches the real one."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+@pytest.fixture(scope="session")
+def shared_detector():
+    """Platform detector for the real host, detected once per test session."""
+    return PlatformDetector()
+
+
+@pytest.fixture(scope="session")
+def mock_config():
+    """Configuration mock shared by every test that stubs out get_config."""
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_get_config(monkeypatch, mock_config):
+    """
+    Patch cli.get_config to return the shared configuration mock.
+
+    Returns:
+        The get_config mock, so tests can set a side_effect instead.
+    """
+    get_config = MagicMock(return_value=mock_config)
+    monkeypatch.setattr("command_line_assistant.cli.get_config", get_config)
+    return get_config
+
+
+@pytest.fixture
+def mock_generate(monkeypatch):
+    """
+    Stub OllamaClient.generate_with_system_prompt for every client.
+
+    Returns:
+        The stub mock; set return_value or side_effect to the streamed response chunks.
+    """
+    generate = MagicMock(return_value=())
+    monkeypatch.setattr(OllamaClient, "generate_with_system_prompt", generate)
+    return generate
+
+
+@pytest.fixture
+def run_query(capsys):
+    """
+    Run a query through process_query_with_execution, bypassing Click.
+
+    Returns:
+        Function taking the query (plus process_query_with_execution keyword
+        arguments) and returning everything written to stdout and stderr.
+    """
+    def run(query, auto_confirm=True, **kwargs):
+        client = OllamaClient(MagicMock())
+        process_query_with_execution(client, query, auto_confirm=auto_confirm, **kwargs)
+        captured = capsys.readouterr()
+        return captured.out + captured.err
+
+    return run
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    """
+    Serve subprocess.run from COMMAND_OUTPUTS instead of running commands.
+
+    Returns:
+        List of (command, keyword arguments) for each call, in order.
+    """
+    calls = []
+
+    def run(command, **kwargs):
+        calls.append((command, kwargs))
+        return subprocess.CompletedProcess(command, 0, stdout=COMMAND_OUTPUTS.get(command, ""), stderr="")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return calls
@@ -31,12 +31,8 @@ def test_cli_help():
 
 
 @patch("command_line_assistant.cli.OllamaClient")
-@patch("command_line_assistant.cli.get_config")
-def test_cli_single_query(mock_get_config, mock_client_class):
+def test_cli_single_query(mock_client_class, mock_get_config):
     """Test single query mode."""
-    mock_config = MagicMock()
-    mock_get_config.return_value = mock_config
-
     mock_client = MagicMock()
     mock_client.generate.return_value = ["Response", " text"]
     mock_client_class.return_value = mock_client
@@ -51,12 +47,8 @@ def test_cli_single_query(mock_get_config, mock_client_class):
 
 
 @patch("command_line_assistant.cli.OllamaClient")
-@patch("command_line_assistant.cli.get_config")
-def test_cli_connection_error(mock_get_config, mock_client_class):
+def test_cli_connection_error(mock_client_class, mock_get_config):
     """Test handling of connection errors."""
-    mock_config = MagicMock()
-    mock_get_config.return_value = mock_config
-
     mock_client = MagicMock()
     mock_client.generate.side_effect = OllamaConnectionError("Connection failed")
     mock_client_class.return_value = mock_client
@@ -69,7 +61,6 @@ def test_cli_connection_error(mock_get_config, mock_client_class):
     assert "Connection failed" in result.output
 
 
-@patch("command_line_assistant.cli.get_config")
 def test_cli_config_error(mock_get_config):
     """Test handling of configuration errors."""
     mock_get_config.side_effect = ConfigurationError("Config error")
@@ -83,12 +74,8 @@ def test_cli_config_error(mock_get_config):
 
 
 @patch("command_line_assistant.cli.OllamaClient")
-@patch("command_line_assistant.cli.get_config")
-def test_cli_invalid_temperature(mock_get_config, mock_client_class):
+def test_cli_invalid_temperature(mock_client_class, mock_get_config):
     """Test handling of invalid temperature."""
-    mock_config = MagicMock()
-    mock_get_config.return_value = mock_config
-
     runner = CliRunner()
     result = runner.invoke(main, ["--temperature", "3.0", "test question"])
 
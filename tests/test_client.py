@@ -13,6 +13,19 @@ from command_line_assistant.exceptions import (
 )
 
 
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """Ollama client shared by the tests in this module, configured from a fixed file."""
+    config_file = tmp_path_factory.mktemp("config") / "config.toml"
+    config_file.write_text(
+        '[ollama]\n'
+        'endpoint = "http://localhost:11434/api/generate"\n'
+        'model = "mistral-nemo"\n'
+        'temperature = 0.1\n'
+    )
+    return OllamaClient(Config(config_file))
+
+
 def test_client_initialization():
     """Test client initialization with config."""
     config = Config()
@@ -22,6 +35,23 @@ def test_client_initialization():
     assert client.temperature == config.ollama_temperature
 
 
+def test_clients_share_http_session(monkeypatch, client):
+    """Test all clients reuse one HTTP session with a small connection pool."""
+    # Start without a session so this test sees it being created
+    monkeypatch.setattr("command_line_assistant.client._session", None)
+    other_client = OllamaClient(client.config)
+
+    with patch("command_line_assistant.client.HTTPAdapter") as mock_adapter, patch.object(
+        requests.Session, "post", autospec=True, return_value=Mock(status_code=200)
+    ) as mock_post:
+        assert client.test_connection()
+        assert other_client.test_connection()
+
+    mock_adapter.assert_called_once_with(pool_connections=1, pool_maxsize=4)
+    first_session, second_session = (call.args[0] for call in mock_post.call_args_list)
+    assert first_session is second_session
+
+
 def test_client_default_config():
     """Test client initialization without config."""
     client = OllamaClient()
@@ -29,8 +59,8 @@ def test_client_default_config():
     assert client.model is not None
 
 
-@patch("command_line_assistant.client.requests.post")
-def test_generate_streaming(mock_post):
+@patch("command_line_assistant.client.requests.Session.post")
+def test_generate_streaming(mock_post, client):
     """Test streaming response generation."""
     # Mock streaming response
     response_lines = [
@@ -44,7 +74,6 @@ def test_generate_streaming(mock_post):
     mock_response.status_code = 200
     mock_post.return_value = mock_response
 
-    client = OllamaClient()
     chunks = list(client.generate("test prompt"))
 
     assert chunks == ["Hello", " world", "!"]
@@ -55,15 +84,14 @@ def test_generate_streaming(mock_post):
     assert call_args[1]["json"]["stream"] is True
 
 
-@patch("command_line_assistant.client.requests.post")
-def test_generate_non_streaming(mock_post):
+@patch("command_line_assistant.client.requests.Session.post")
+def test_generate_non_streaming(mock_post, client):
     """Test non-streaming response generation."""
     mock_response = Mock()
     mock_response.json.return_value = {"response": "Complete response"}
     mock_response.status_code = 200
     mock_post.return_value = mock_response
 
-    client = OllamaClient()
     response = client.generate_complete("test prompt")
 
     assert response == "Complete response"
@@ -72,57 +100,46 @@ def test_generate_non_streaming(mock_post):
     assert call_args[1]["json"]["stream"] is False
 
 
-@patch("command_line_assistant.client.requests.post")
-def test_connection_error(mock_post):
-    """Test handling of connection errors."""
-    mock_post.side_effect = requests.exceptions.ConnectionError("Connection failed")
-
-    client = OllamaClient()
-    with pytest.raises(OllamaConnectionError):
-        list(client.generate("test prompt"))
-
-
-@patch("command_line_assistant.client.requests.post")
-def test_api_error(mock_post):
-    """Test handling of API errors."""
+def _server_error_response():
+    """Create a response whose status check raises an HTTP error."""
     mock_response = Mock()
     mock_response.status_code = 500
     mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
         "Server error"
     )
-    mock_post.return_value = mock_response
+    return mock_response
 
-    client = OllamaClient()
-    with pytest.raises(OllamaAPIError):
-        list(client.generate("test prompt"))
 
+@pytest.mark.parametrize(
+    "post_result,expected_error",
+    [
+        (requests.exceptions.ConnectionError("Connection failed"), OllamaConnectionError),
+        (requests.exceptions.Timeout("Request timed out"), OllamaConnectionError),
+        (_server_error_response(), OllamaAPIError),
+    ],
+    ids=["connection", "timeout", "server_error"],
+)
+@patch("command_line_assistant.client.requests.Session.post")
+def test_generate_errors(mock_post, client, post_result, expected_error):
+    """Test request failures are raised as client errors."""
+    # An exception in side_effect is raised, anything else is returned
+    mock_post.side_effect = [post_result]
 
-@patch("command_line_assistant.client.requests.post")
-def test_timeout_error(mock_post):
-    """Test handling of timeout errors."""
-    mock_post.side_effect = requests.exceptions.Timeout("Request timed out")
-
-    client = OllamaClient()
-    with pytest.raises(OllamaConnectionError):
+    with pytest.raises(expected_error):
         list(client.generate("test prompt"))
 
 
-@patch("command_line_assistant.client.requests.post")
-def test_test_connection_success(mock_post):
-    """Test connection test with successful response."""
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_post.return_value = mock_response
-
-    client = OllamaClient()
-    assert client.test_connection() is True
-
-
-@patch("command_line_assistant.client.requests.post")
-def test_test_connection_failure(mock_post):
-    """Test connection test with failed response."""
-    mock_post.side_effect = requests.exceptions.ConnectionError()
-
-    client = OllamaClient()
-    assert client.test_connection() is False
+@pytest.mark.parametrize(
+    "post_result,expected",
+    [
+        (Mock(status_code=200), True),
+        (requests.exceptions.ConnectionError(), False),
+    ],
+    ids=["success", "failure"],
+)
+@patch("command_line_assistant.client.requests.Session.post")
+def test_test_connection(mock_post, client, post_result, expected):
+    """Test connection test with successful and failed responses."""
+    mock_post.side_effect = [post_result]
 
+    assert client.test_connection() is expected
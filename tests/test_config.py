@@ -1,7 +1,6 @@
 """Tests for configuration management."""
 
 import os
-import tempfile
 from pathlib import Path
 import pytest
 
@@ -16,25 +15,21 @@ def test_default_config():
     assert config.ollama_temperature == 0.1
 
 
-def test_config_from_file():
+def test_config_from_file(tmp_path):
     """Test loading configuration from a file."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
-        f.write(
-            """[ollama]
+    config_path = tmp_path / "config.toml"
+    config_path.write_text(
+        """[ollama]
 endpoint = "http://example.com:11434/api/generate"
 model = "mistral"
 temperature = 0.9
 """
-        )
-        config_path = Path(f.name)
+    )
 
-    try:
-        config = Config(config_path=config_path)
-        assert config.ollama_endpoint == "http://example.com:11434/api/generate"
-        assert config.ollama_model == "mistral"
-        assert config.ollama_temperature == 0.9
-    finally:
-        config_path.unlink()
+    config = Config(config_path=config_path)
+    assert config.ollama_endpoint == "http://example.com:11434/api/generate"
+    assert config.ollama_model == "mistral"
+    assert config.ollama_temperature == 0.9
 
 
 def test_config_environment_overrides():
@@ -54,34 +49,26 @@ def test_config_environment_overrides():
         os.environ.pop("OLLAMA_TEMPERATURE", None)
 
 
-def test_config_invalid_temperature():
+def test_config_invalid_temperature(tmp_path):
     """Test validation of temperature values."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
-        f.write(
-            """[ollama]
+    config_path = tmp_path / "config.toml"
+    config_path.write_text(
+        """[ollama]
 temperature = 3.0
 """
-        )
-        config_path = Path(f.name)
+    )
 
-    try:
-        with pytest.raises(ConfigurationError, match="Temperature must be between"):
-            Config(config_path=config_path)
-    finally:
-        config_path.unlink()
+    with pytest.raises(ConfigurationError, match="Temperature must be between"):
+        Config(config_path=config_path)
 
 
-def test_config_invalid_file():
+def test_config_invalid_file(tmp_path):
     """Test handling of invalid config file."""
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
-        f.write("invalid toml content {")
-        config_path = Path(f.name)
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("invalid toml content {")
 
-    try:
-        with pytest.raises(ConfigurationError):
-            Config(config_path=config_path)
-    finally:
-        config_path.unlink()
+    with pytest.raises(ConfigurationError):
+        Config(config_path=config_path)
 
 
 def test_config_nonexistent_file():
@@ -1,190 +1,127 @@
 """Tests for command output analysis and reaction."""
 
-import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import pytest
-from click.testing import CliRunner
 
-from command_line_assistant.cli import main
-from command_line_assistant.executor import CommandExecutor
-
-# Disable Ollama strategy selection in tests
-os.environ["CLA_USE_OLLAMA_STRATEGY"] = "false"
-
-
-class TestOutputAnalysis:
-    """Tests for command output analysis and reaction."""
-
-    @patch("command_line_assistant.executor.CommandExecutor.execute_command")
-    @patch("command_line_assistant.cli.OllamaClient.generate_with_system_prompt")
-    @patch("command_line_assistant.cli.get_config")
-    def test_error_output_analysis(
-        self, mock_get_config, mock_generate, mock_execute
-    ):
-        """Test that AI analyzes error output and reacts."""
-        mock_config = MagicMock()
-        mock_get_config.return_value = mock_config
-
-        # First response: command to run
-        first_response = """I'll check if a service exists.
+SYSTEMCTL_STATUS_RESPONSE = """I'll check if a service exists.
 
 ```bash
 systemctl status nonexistent-service
 ```"""
 
-        # Second response: analyzing the error
-        second_response = """The service doesn't exist. Let me check what services are available.
+SYSTEMCTL_LIST_RESPONSE = """The service doesn't exist. Let me check what services are available.
 
 ```bash
 systemctl list-units --type=service | head -20
 ```"""
 
-        mock_generate.side_effect = [
-            iter([first_response]),
-            iter([second_response]),
-        ]
-
-        # First command fails (service not found)
-        mock_execute.side_effect = [
-            (1, "", "Unit nonexistent-service.service could not be found."),
-            (0, "systemd.service\n", ""),
-        ]
-
-        runner = CliRunner()
-        result = runner.invoke(
-            main, ["--execute", "--yes", "check nonexistent service"], catch_exceptions=False
-        )
-
-        # Verify two commands were executed
-        assert mock_execute.call_count == 2
-
-        # Verify AI was called at least twice (initial + reaction)
-        # May be more due to structured output fallback
-        assert mock_generate.call_count >= 2
-
-        # Verify error was analyzed
-        second_call_args = mock_generate.call_args_list[1][0]
-        assert "error" in str(second_call_args[0]).lower() or "output" in str(second_call_args[0]).lower()
-
-    @patch("command_line_assistant.executor.CommandExecutor.execute_command")
-    @patch("command_line_assistant.cli.OllamaClient.generate_with_system_prompt")
-    @patch("command_line_assistant.cli.get_config")
-    def test_success_output_analysis(
-        self, mock_get_config, mock_generate, mock_execute
-    ):
-        """Test that AI analyzes successful output."""
-        mock_config = MagicMock()
-        mock_get_config.return_value = mock_config
-
-        # First response: command
-        first_response = """I'll check disk usage.
+DF_H_RESPONSE = """I'll check disk usage.
 
 ```bash
 df -h
 ```"""
 
-        # Second response: task complete (no code block)
-        second_response = """The disk usage shows 77% used on the root filesystem. The task is complete."""
-
-        mock_generate.side_effect = [
-            iter([first_response]),
-            iter([second_response]),
-        ]
-
-        # Command succeeds
-        mock_execute.return_value = (
-            0,
-            "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1        20G   15G  4.5G  77% /\n",
-            "",
-        )
+DISK_SUMMARY_RESPONSE = "The disk usage shows 77% used on the root filesystem. The task is complete."
 
-        runner = CliRunner()
-        result = runner.invoke(
-            main, ["--execute", "--yes", "check disk usage"], catch_exceptions=False
-        )
+DF_H_OUTPUT = "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1        20G   15G  4.5G  77% /\n"
 
-        # Verify command was executed
-        assert mock_execute.called
-
-        # Verify AI analyzed the output (second call)
-        assert mock_generate.call_count >= 1
-
-    @patch("command_line_assistant.executor.CommandExecutor.execute_command")
-    @patch("command_line_assistant.cli.OllamaClient.generate_with_system_prompt")
-    @patch("command_line_assistant.cli.get_config")
-    def test_follow_up_command_on_error(
-        self, mock_get_config, mock_generate, mock_execute
-    ):
-        """Test that AI provides follow-up commands when errors occur."""
-        mock_config = MagicMock()
-        mock_get_config.return_value = mock_config
-
-        # First: try to install
-        first_response = """I'll install the package.
+DNF_INSTALL_RESPONSE = """I'll install the package.
 
 ```bash
 sudo dnf install -y test-package
 ```"""
 
-        # Second: analyze error and provide fix
-        second_response = """The package wasn't found. Let me check available packages.
+DNF_SEARCH_RESPONSE = """The package wasn't found. Let me check available packages.
 
 ```bash
 dnf search test-package
 ```"""
 
-        mock_generate.side_effect = [
-            iter([first_response]),
-            iter([second_response]),
-        ]
-
-        # First command fails, second succeeds
-        mock_execute.side_effect = [
-            (1, "", "No package test-package available."),
-            (0, "test-package.x86_64 : Test package", ""),
-        ]
-
-        runner = CliRunner()
-        result = runner.invoke(
-            main, ["--execute", "--yes", "install test-package"], catch_exceptions=False
-        )
-
-        # Verify both commands executed
-        assert mock_execute.call_count == 2
-
-        # Verify output was passed to AI for analysis
-        second_call = mock_generate.call_args_list[1][0][0]
-        assert "output" in second_call.lower() or "error" in second_call.lower()
-
-    @patch("command_line_assistant.executor.CommandExecutor.execute_command")
-    @patch("command_line_assistant.cli.OllamaClient.generate_with_system_prompt")
-    @patch("command_line_assistant.cli.get_config")
-    def test_max_iterations_limit(
-        self, mock_get_config, mock_generate, mock_execute
-    ):
-        """Test that max iterations limit is respected."""
-        mock_config = MagicMock()
-        mock_get_config.return_value = mock_config
-
-        # Always return a command (simulating infinite loop scenario)
-        mock_generate.return_value = iter([
-            """Continue task.
+ECHO_LOOP_RESPONSE = """Continue task.
 
 ```bash
 echo "test"
 ```"""
-        ])
 
-        mock_execute.return_value = (0, "test\n", "")
 
-        runner = CliRunner()
-        result = runner.invoke(
-            main, ["--execute", "--yes", "test task"], catch_exceptions=False
-        )
+def _conversation(turns):
+    """
+    Build mock side effects for a multi-turn conversation.
+
+    Args:
+        turns: One dict per AI turn with the response under "ai" and, for turns
+            whose command gets executed, its "rc", "out" and "err".
+
+    Returns:
+        Tuple of (generate_with_system_prompt, execute_command) side effects.
+    """
+    ai_responses = [(turn["ai"],) for turn in turns]
+    executions = [(turn.get("rc", 0), turn.get("out", ""), turn.get("err", "")) for turn in turns]
+    return ai_responses, executions
 
-        # Should stop after max_iterations (default 5)
-        # Note: Due to structured output fallback, may execute fewer commands
-        assert mock_execute.call_count <= 5
-        # Check if we hit max iterations or if execution stopped for another reason
-        assert "maximum iterations" in result.output.lower() or mock_execute.call_count >= 1
 
+class TestOutputAnalysis:
+    """Tests for command output analysis and reaction."""
+
+    @pytest.mark.parametrize(
+        "query,turns,expected_executions,expected_output",
+        [
+            pytest.param(
+                "check nonexistent service",
+                [
+                    {
+                        "ai": SYSTEMCTL_STATUS_RESPONSE,
+                        "rc": 1,
+                        "err": "Unit nonexistent-service.service could not be found.",
+                    },
+                    {"ai": SYSTEMCTL_LIST_RESPONSE, "out": "systemd.service\n"},
+                    {"ai": "The task is complete."},
+                ],
+                2,
+                None,
+                id="error_output",
+            ),
+            pytest.param(
+                "check disk usage",
+                [{"ai": DF_H_RESPONSE, "out": DF_H_OUTPUT}, {"ai": DISK_SUMMARY_RESPONSE}],
+                1,
+                None,
+                id="success_output",
+            ),
+            pytest.param(
+                "install test-package",
+                [
+                    {"ai": DNF_INSTALL_RESPONSE, "rc": 1, "err": "No package test-package available."},
+                    {"ai": DNF_SEARCH_RESPONSE, "out": "test-package.x86_64 : Test package"},
+                    {"ai": "The task is complete."},
+                ],
+                2,
+                None,
+                id="follow_up_on_error",
+            ),
+            pytest.param(
+                "test task",
+                # Always return a command (simulating infinite loop scenario)
+                [{"ai": ECHO_LOOP_RESPONSE, "out": "test\n"}] * 5,
+                5,
+                "maximum iterations",
+                id="max_iterations",
+            ),
+        ],
+    )
+    @patch("command_line_assistant.executor.CommandExecutor.execute_command")
+    def test_output_analysis(
+        self, mock_execute, mock_generate, run_query, query, turns, expected_executions, expected_output
+    ):
+        """Test that AI is given each command's output and reacts to it."""
+        mock_generate.side_effect, mock_execute.side_effect = _conversation(turns)
+
+        output = run_query(query).lower()
+
+        assert mock_execute.call_count == expected_executions
+        # Each command's result is passed to the AI for analysis on the next call
+        for turn, call in zip(turns, mock_generate.call_args_list[1:]):
+            result = turn.get("out") or turn.get("err")
+            assert result.strip() in call[0][0]
+        if expected_output:
+            assert expected_output in output
@@ -1,64 +1,56 @@
 """Tests for platform detection."""
 
 import pytest
-from unittest.mock import patch, mock_open
 from pathlib import Path
 
 from command_line_assistant.platform_detector import PlatformDetector, PlatformType
 
 
-def test_platform_detector_initialization():
+def test_platform_detector_initialization(shared_detector):
     """Test platform detector initialization."""
-    detector = PlatformDetector()
+    detector = shared_detector
     assert detector.platform is not None
     assert detector.detection_reason is not None
 
 
-def test_platform_detector_rhel_detection():
-    """Test RHEL platform detection."""
-    os_release_content = """ID=fedora
-VERSION_ID=43
-NAME="Fedora Linux"
-ID_LIKE="rhel"
-"""
-    with patch('pathlib.Path.exists', return_value=True):
-        with patch('builtins.open', mock_open(read_data=os_release_content)):
-            detector = PlatformDetector()
-            # Force re-detection
-            detector._detect_platform()
-            assert detector.platform == PlatformType.RHEL
-            assert "fedora" in detector.detection_reason.lower() or "rhel" in detector.detection_reason.lower()
-
-
-def test_platform_detector_debian_detection():
-    """Test Debian platform detection."""
-    os_release_content = """ID=ubuntu
-VERSION_ID=22.04
-NAME="Ubuntu"
-ID_LIKE="debian"
-"""
-    with patch('pathlib.Path.exists', return_value=True):
-        with patch('builtins.open', mock_open(read_data=os_release_content)):
-            detector = PlatformDetector()
-            detector._detect_platform()
-            assert detector.platform == PlatformType.DEBIAN
-            assert "ubuntu" in detector.detection_reason.lower() or "debian" in detector.detection_reason.lower()
-
-
-def test_platform_detector_get_commands():
-    """Test getting platform-specific commands."""
+@pytest.mark.parametrize(
+    "os_release_content,expected_platform",
+    [
+        pytest.param('ID=fedora\nVERSION_ID=43\nNAME="Fedora Linux"\nID_LIKE="rhel"\n', PlatformType.RHEL, id="fedora"),
+        pytest.param('ID=ubuntu\nVERSION_ID=22.04\nNAME="Ubuntu"\nID_LIKE="debian"\n', PlatformType.DEBIAN, id="ubuntu"),
+        pytest.param('ID=arch\nNAME="Arch Linux"\n', PlatformType.ARCH, id="arch"),
+        pytest.param('ID=sles\nVERSION_ID=15.5\nNAME="SLES"\n', PlatformType.SUSE, id="sles"),
+    ],
+)
+def test_platform_detector_os_release_detection(monkeypatch, tmp_path, os_release_content, expected_platform):
+    """Test platform detection from /etc/os-release."""
+    os_release = tmp_path / "os-release"
+    os_release.write_text(os_release_content)
+    # Redirect only the detector's view of /etc/os-release to the test file
+    monkeypatch.setattr(
+        "command_line_assistant.platform_detector.Path",
+        lambda path: os_release if str(path) == "/etc/os-release" else Path(path),
+    )
+
     detector = PlatformDetector()
-    commands = detector.get_commands()
+
+    assert detector.platform == expected_platform
+    distro_id = os_release_content.split("\n")[0].split("=")[1]
+    assert distro_id in detector.detection_reason.lower()
+
+
+def test_platform_detector_get_commands(shared_detector):
+    """Test getting platform-specific commands."""
+    commands = shared_detector.get_commands()
     assert "package_manager" in commands
     assert "service_manager" in commands
     assert "firewall" in commands
     assert "network" in commands
 
 
-def test_platform_detector_get_platform_info():
+def test_platform_detector_get_platform_info(shared_detector):
     """Test getting comprehensive platform information."""
-    detector = PlatformDetector()
-    info = detector.get_platform_info()
+    info = shared_detector.get_platform_info()
     assert "platform" in info
     assert "distribution" in info
     assert "version" in info
@@ -67,10 +59,9 @@ def test_platform_detector_get_platform_info():
     assert "package_manager" in info
 
 
-def test_platform_detector_package_manager():
+def test_platform_detector_package_manager(shared_detector):
     """Test getting package manager."""
-    detector = PlatformDetector()
-    pm = detector.get_package_manager()
+    pm = shared_detector.get_package_manager()
     assert pm in ["dnf", "yum", "apt", "apt-get", "pacman", "zypper", "emerge"]
 
 
@@ -0,0 +1,349 @@
+"""Tests for system prompt builder."""
+
+import json
+from unittest.mock import MagicMock, patch
+import pytest
+
+from command_line_assistant.prompt_builder import PromptBuilder
+
+
+def _make_detector():
+    """Create a platform detector stub."""
+    detector = MagicMock()
+    detector.get_platform_info.return_value = {
+        "platform": "rhel",
+        "distribution": "Fedora Linux",
+        "version": "43",
+        "detection_reason": "test",
+        "commands": {
+            "package_manager": "dnf",
+            "service_manager": "systemctl",
+            "firewall": "firewalld",
+            "network": "nmcli",
+        },
+        "package_manager": "dnf",
+    }
+    return detector
+
+
+def test_platform_info_detected_once(tmp_path):
+    """Test platform info is fetched once and reused across prompts."""
+    detector = _make_detector()
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=detector)
+
+    builder.build_system_prompt(allow_sudo=False)
+    builder.build_system_prompt(allow_sudo=True)
+
+    detector.get_platform_info.assert_called_once()
+
+
+def test_refresh_platform_detects_again(tmp_path):
+    """Test refresh_platform makes the next prompt use newly detected platform info."""
+    detector = _make_detector()
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=detector)
+    assert "Platform: Fedora Linux" in builder.build_system_prompt()
+
+    detector.get_platform_info.return_value = {
+        **detector.get_platform_info.return_value,
+        "distribution": "Ubuntu",
+        "commands": {"package_manager": "apt"},
+    }
+    builder.refresh_platform()
+
+    prompt = builder.build_system_prompt(allow_sudo=True)
+    assert "Platform: Ubuntu" in prompt
+    assert "sudo apt install -y nginx" in prompt
+    assert detector.get_platform_info.call_count == 2
+
+
+def test_platform_detector_created_lazily(tmp_path):
+    """Test platform detection is deferred until a prompt is built."""
+    with patch("command_line_assistant.prompt_builder.PlatformDetector") as mock_detector_class:
+        mock_detector_class.return_value = _make_detector()
+        builder = PromptBuilder(learning_file=tmp_path / "learning.json")
+        builder.record_success("check disk usage", "df -h", "")
+        mock_detector_class.assert_not_called()
+
+        builder.build_system_prompt()
+        mock_detector_class.assert_called_once()
+
+
+def test_system_prompt_uses_platform_commands(tmp_path):
+    """Test system prompt contains platform-specific commands."""
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=_make_detector())
+
+    prompt = builder.build_system_prompt(allow_sudo=True)
+
+    assert "Platform: Fedora Linux" in prompt
+    assert "sudo dnf install -y nginx" in prompt
+
+
+def test_system_prompt_rerendered_after_learning(tmp_path):
+    """Test rendered prompts are reused until learning data changes."""
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=_make_detector())
+
+    first = builder.build_system_prompt(allow_sudo=False)
+    assert builder.build_system_prompt(allow_sudo=False) is first
+
+    builder.record_environment_context("shell", "zsh")
+    updated = builder.build_system_prompt(allow_sudo=False)
+
+    assert "• shell: zsh" in updated
+    assert "• shell: zsh" not in first
+
+
+def test_system_prompt_kept_after_error_solution(tmp_path):
+    """Test recording an error solution, which is not in the prompt, keeps the rendered prompt."""
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=_make_detector())
+
+    first = builder.build_system_prompt(allow_sudo=False)
+    builder.record_error_solution("permission denied", "sudo !!")
+
+    assert builder.build_system_prompt(allow_sudo=False) is first
+
+
+def test_record_success_keeps_recent_patterns(tmp_path):
+    """Test only the most recent successful patterns are kept and saved."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+
+    for i in range(PromptBuilder.MAX_SUCCESSFUL_PATTERNS + 5):
+        builder.record_success(f"query {i}", f"echo {i}", "")
+
+    patterns = builder.learning_data["successful_patterns"]
+    assert len(patterns) == PromptBuilder.MAX_SUCCESSFUL_PATTERNS
+    assert patterns[0].command == "echo 5"
+
+    builder.flush_learning_data()
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert list(reloaded.learning_data["successful_patterns"]) == list(patterns)
+
+
+def test_record_success_stores_trimmed_context(tmp_path):
+    """Test the stored context is a stripped snippet of the command output."""
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=_make_detector())
+    builder.record_success("check service", "systemctl is-active sshd", "active\n")
+    builder.record_success("dump logs", "journalctl", "x" * 1000)
+
+    first, second = builder.learning_data["successful_patterns"]
+    assert first.context == "active"
+    assert len(second.context) == 200
+
+
+def test_learning_data_written_in_background(tmp_path):
+    """Test changes are coalesced and written off the caller's path."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.SAVE_DELAY_SECONDS = 0.5
+
+    builder.record_environment_context("shell", "bash")
+    builder.record_environment_context("project_type", "python")
+    timer = builder._save_timer
+    assert not builder.learning_log.exists()
+
+    timer.join(timeout=5)
+    events = [json.loads(line) for line in builder.learning_log.read_text().splitlines()]
+    assert events == [
+        {"n": 1, "k": "environment", "p": {"key": "shell", "value": "bash"}},
+        {"n": 2, "k": "environment", "p": {"key": "project_type", "value": "python"}},
+    ]
+
+
+def test_pending_changes_flushed_for_new_builder(tmp_path):
+    """Test a new builder for the same file sees changes not yet written."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.record_environment_context("project_type", "python")
+
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert reloaded.get_environment_context("project_type") == "python"
+    assert builder._save_timer is None
+
+
+def test_get_relevant_patterns_matches_query_words(tmp_path):
+    """Test relevant patterns are matched on shared words, most recent first."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.record_success("check disk usage", "df -h", "")
+    builder.record_success("list running services", "systemctl list-units", "")
+    builder.record_success("show disk usage of home", "du -sh ~", "")
+
+    relevant = builder.get_relevant_patterns("Disk space", limit=2)
+
+    assert [p.command for p in relevant] == ["du -sh ~", "df -h"]
+    assert builder.get_relevant_patterns("a b c") == []
+
+    builder.flush_learning_data()
+    assert "tokens" not in builder.learning_log.read_text()
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert [p.command for p in reloaded.get_relevant_patterns("services")] == ["systemctl list-units"]
+
+
+def test_get_error_solution_matches_substrings(tmp_path):
+    """Test known error solutions match when either error contains the other."""
+    builder = PromptBuilder(learning_file=tmp_path / "learning.json", platform_detector=_make_detector())
+    builder.record_error_solution("No such file or directory", "mkdir -p /tmp/x")
+    builder.record_error_solution("permission denied", "sudo !!")
+
+    assert builder.get_error_solution("cat: foo: No such file or directory") == "mkdir -p /tmp/x"
+    assert builder.get_error_solution("Permission") == "sudo !!"
+    assert builder.get_error_solution("command not found") is None
+
+
+def test_record_error_solution_keeps_recent_solutions(tmp_path):
+    """Test only the most recent distinct solutions are kept per error."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    for i in range(PromptBuilder.MAX_ERROR_SOLUTIONS + 2):
+        builder.record_error_solution("disk full", f"fix {i}")
+    builder.record_error_solution("disk full", "fix 6")
+
+    solutions = builder.learning_data["error_solutions"]["disk full"]
+    assert list(solutions) == ["fix 2", "fix 3", "fix 4", "fix 5", "fix 6"]
+    assert builder.get_error_solution("disk full") == "fix 6"
+
+    builder.flush_learning_data()
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert list(reloaded.learning_data["error_solutions"]["disk full"]) == list(solutions)
+
+
+def test_learning_log_compacted_into_learning_file(tmp_path):
+    """Test the learning log is folded into the learning file once it grows too long."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.COMPACT_LOG_LINES = 3
+
+    builder.record_success("check disk usage", "df -h", "")
+    builder.record_error_solution("Permission denied", "sudo !!")
+    builder.flush_learning_data()
+    assert not learning_file.exists()
+    assert len(builder.learning_log.read_text().splitlines()) == 2
+
+    builder.record_environment_context("shell", "bash")
+    builder.record_environment_context("editor", "vim")
+    builder.flush_learning_data()
+    assert not builder.learning_log.exists()
+    saved = json.loads(learning_file.read_text())
+    assert saved["successful_patterns"] == [{"query": "check disk usage", "command": "df -h", "context": ""}]
+    assert saved["error_solutions"] == {"permission denied": ["sudo !!"]}
+
+    builder.record_success("list services", "systemctl list-units", "")
+    builder.flush_learning_data()
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert [p.command for p in reloaded.learning_data["successful_patterns"]] == ["df -h", "systemctl list-units"]
+    assert reloaded.get_environment_context("editor") == "vim"
+    assert reloaded.get_error_solution("permission denied") == "sudo !!"
+
+
+def test_interrupted_compaction_not_replayed(tmp_path):
+    """Test events left in the log by a compaction that stopped before removing it are not applied twice."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.COMPACT_LOG_LINES = 2
+    builder.record_success("check disk usage", "df -h", "")
+    builder.record_success("list services", "systemctl list-units", "")
+    builder.flush_learning_data()
+    log = builder.learning_log.read_bytes()
+
+    builder.record_success("show memory", "free -h", "")
+    builder.flush_learning_data()
+    assert learning_file.exists()
+    # Put the log back as if the process died right after replacing the learning file
+    builder.learning_log.write_bytes(log)
+
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert [p.command for p in reloaded.learning_data["successful_patterns"]] == [
+        "df -h", "systemctl list-units", "free -h"
+    ]
+
+    reloaded.record_success("show uptime", "uptime", "")
+    reloaded.flush_learning_data()
+    again = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert [p.command for p in again.learning_data["successful_patterns"]][-2:] == ["free -h", "uptime"]
+    assert len(again.learning_data["successful_patterns"]) == 4
+
+
+def test_large_learning_file_loaded(tmp_path, monkeypatch):
+    """Test learning files above the memory-map threshold load the same way."""
+    learning_file = tmp_path / "learning.json"
+    learning_file.write_text(json.dumps({
+        "successful_patterns": [{"query": "check disk usage", "command": "df -h", "context": ""}],
+        "error_solutions": {"no space left": ["df -h"]},
+        "environment_context": {"shell": "bash"},
+        "user_preferences": {},
+    }))
+    monkeypatch.setattr("command_line_assistant.prompt_builder.MMAP_MIN_BYTES", 0)
+
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+
+    assert [p.command for p in builder.get_relevant_patterns("disk")] == ["df -h"]
+    assert builder.get_environment_context("shell") == "bash"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_learning_data_round_trip_with_and_without_orjson(tmp_path, monkeypatch, use_orjson):
+    """Test learning data written and read back with orjson and the json fallback."""
+    import command_line_assistant.prompt_builder as prompt_builder_module
+
+    if use_orjson and prompt_builder_module.orjson is None:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(prompt_builder_module, "USE_ORJSON", use_orjson)
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.COMPACT_LOG_LINES = 2
+
+    builder.record_success("check disk usage", "df -h", "Filesystem  Size")
+    builder.record_error_solution("No space left on device", "docker system prune")
+    builder.flush_learning_data()
+    assert len(builder.learning_log.read_text().splitlines()) == 2
+    builder.record_environment_context("shell", "zsh")
+    builder.flush_learning_data()
+
+    assert json.loads(learning_file.read_text())["environment_context"] == {"shell": "zsh"}
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert list(reloaded.learning_data["successful_patterns"]) == list(builder.learning_data["successful_patterns"])
+    assert reloaded.get_error_solution("no space left on device") == "docker system prune"
+    assert reloaded.get_environment_context("shell") == "zsh"
+
+
+def test_error_solutions_evict_least_recently_used(tmp_path):
+    """Test only the most recently used errors are kept, and evicted ones stop matching."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.MAX_ERROR_KEYS = 3
+    builder.record_error_solution("disk full", "df -h")
+    builder.record_error_solution("permission denied", "sudo !!")
+    builder.record_error_solution("command not found", "dnf install")
+
+    assert builder.get_error_solution("disk full") == "df -h"
+    builder.record_error_solution("connection refused", "systemctl start sshd")
+
+    assert list(builder.learning_data["error_solutions"]) == ["command not found", "disk full", "connection refused"]
+    assert builder.get_error_solution("permission denied") is None
+    assert builder.get_error_solution("connection refused") == "systemctl start sshd"
+
+
+def test_error_solution_choice_survives_reload(tmp_path):
+    """Test the most recently used of several matching errors wins, before and after a reload."""
+    learning_file = tmp_path / "learning.json"
+    builder = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    builder.record_error_solution("permission denied", "sudo !!")
+    builder.record_error_solution("permission denied for /var", "chmod o+r /var")
+    both = "ls: permission denied for /var/log"
+
+    builder.flush_learning_data()
+    logged = builder.learning_log.read_bytes()
+
+    assert builder.get_error_solution(both) == "chmod o+r /var"
+    # A lookup matching only the older error makes it the most recently used
+    assert builder.get_error_solution("sudo: permission denied") == "sudo !!"
+    assert builder.get_error_solution(both) == "sudo !!"
+    assert builder.get_error_solution(both) == "sudo !!"
+    # Lookups alone neither write nor schedule a write
+    assert builder._save_timer is None
+    assert builder.learning_log.read_bytes() == logged
+
+    builder.record_environment_context("shell", "bash")
+    builder.flush_learning_data()
+    reloaded = PromptBuilder(learning_file=learning_file, platform_detector=_make_detector())
+    assert reloaded.get_error_solution(both) == "sudo !!"
@@ -0,0 +1,130 @@
+"""Tests for query evaluation strategies."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from command_line_assistant.query_evaluator import (
+    KeywordDetectionStrategy,
+    OllamaStrategySelector,
+    PathDetectionStrategy,
+    PatternDetectionStrategy,
+    PreparedQuery,
+    QueryEvaluator,
+)
+
+
+def test_pattern_detection_matches_project_questions():
+    """Test project question patterns are detected in a single search."""
+    strategy = PatternDetectionStrategy()
+    cwd = Path("/tmp")
+
+    for query in ["What is this project?", "explain the codebase", "Which programming language is used"]:
+        result = strategy.evaluate(query, cwd)
+        assert result is not None
+        assert result.query_type == "project_info"
+        assert result.target_path == cwd
+
+    assert strategy.evaluate("install nginx", cwd) is None
+
+
+def test_keyword_detection_matches_keyword_substrings():
+    """Test any project keyword anywhere in the query is detected."""
+    strategy = KeywordDetectionStrategy()
+    cwd = Path("/tmp")
+
+    result = strategy.evaluate("List the SOURCE files", cwd)
+    assert result is not None
+    assert result.query_type == "project_info"
+    assert strategy.evaluate("show my repos", cwd) is not None
+    assert strategy.evaluate("check disk usage", cwd) is None
+
+
+def test_evaluate_query_prepares_query_once():
+    """Test strategies receive the same prepared query."""
+    strategy = MagicMock()
+    strategy.evaluate.return_value = None
+    evaluator = QueryEvaluator(strategies=[strategy, strategy])
+
+    result = evaluator.evaluate_query("Show Disk Usage for /var", Path("/tmp"))
+
+    assert result.needs_local_context is False
+    first, second = (call.args[0] for call in strategy.evaluate.call_args_list)
+    assert first is second
+    assert first == PreparedQuery(raw="Show Disk Usage for /var", lower="show disk usage for /var")
+
+
+def test_path_detection_extracts_paths(tmp_path):
+    """Test paths are extracted without surrounding whitespace or quotes."""
+    strategy = PathDetectionStrategy()
+    (tmp_path / "src").mkdir()
+
+    result = strategy.evaluate("list ./src please", tmp_path)
+    assert result is not None
+    assert result.target_path == tmp_path / "src"
+    assert result.query_type == "file_operation"
+
+    # Adjacent paths separated by a single space are all matched
+    assert strategy.PATH_PATTERN.findall("diff /etc/hosts ./hosts ~/hosts") == ["/etc/hosts", "./hosts", "~/hosts"]
+    assert strategy._extract_path(f"copy x {tmp_path}/src'", tmp_path) == tmp_path / "src"
+    assert strategy.evaluate("install nginx", tmp_path) is None
+
+
+def test_ollama_selection_cached_per_query_and_cwd():
+    """Test repeated queries in the same directory reuse the Ollama selection."""
+    client = MagicMock()
+    client.generate_structured.return_value = {
+        "selected_strategy": "keyword_detection",
+        "needs_local_context": True,
+        "query_type": "project_info",
+    }
+    selector = OllamaStrategySelector(ollama_client=client)
+
+    first = selector.evaluate("Describe my setup", Path("/tmp"))
+    assert selector.evaluate("describe my setup ", Path("/tmp")) is first
+    assert client.generate_structured.call_count == 1
+
+    selector.evaluate("describe my setup", Path("/var"))
+    assert client.generate_structured.call_count == 2
+
+    selector.clear_cache()
+    client.generate_structured.side_effect = RuntimeError("connection refused")
+    assert selector.evaluate("describe my setup", Path("/tmp")) is None
+    assert selector.evaluate("describe my setup", Path("/tmp")) is None
+    assert client.generate_structured.call_count == 4
+
+
+def test_ollama_only_asked_when_cheap_strategies_miss():
+    """Test the Ollama selector runs after the deterministic strategies."""
+    client = MagicMock()
+    client.generate_structured.return_value = {"selected_strategy": "none", "needs_local_context": False}
+    evaluator = QueryEvaluator(use_ollama=True, ollama_client=client)
+
+    result = evaluator.evaluate_query("what is this project", Path("/tmp"))
+    assert result.needs_local_context is True
+    client.generate_structured.assert_not_called()
+
+    result = evaluator.evaluate_query("install nginx", Path("/tmp"))
+    assert result.needs_local_context is False
+    client.generate_structured.assert_called_once()
+
+
+def test_path_detection_normalizes_without_resolving_symlinks(tmp_path):
+    """Test detected paths are normalized, and symlinks only resolved on request."""
+    (tmp_path / "real").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "real")
+
+    result = PathDetectionStrategy().evaluate("list ./link/../link/", tmp_path)
+    assert result.target_path == tmp_path / "link"
+
+    result = PathDetectionStrategy(resolve_symlinks=True).evaluate("list ./link", tmp_path)
+    assert result.target_path == tmp_path / "real"
+
+
+def test_default_strategies_are_shared():
+    """Test evaluators share the stateless detection strategy instances."""
+    first = QueryEvaluator(use_ollama=False)
+    second = QueryEvaluator(use_ollama=True, ollama_client=MagicMock())
+
+    assert first.strategies == second.strategies[:3]
+    assert first.strategies[0] is PathDetectionStrategy.INSTANCE
+    assert second.strategies[3]._fallback_strategies["path_detection"] is PathDetectionStrategy.INSTANCE
@@ -0,0 +1,64 @@
+"""Tests for input sanitization."""
+
+import pytest
+
+from command_line_assistant.sanitizer import InputSanitizer
+
+
+def test_sanitize_query_removes_dangerous_content():
+    """Test dangerous patterns and control characters are removed from queries."""
+    sanitizer = InputSanitizer()
+
+    assert sanitizer.sanitize_query("  list <script>alert(1)</script> files\x00 ") == "list files"
+    assert sanitizer.sanitize_query("open JavaScript:alert(1)") == "open alert(1)"
+    # Removing one match must not leave a new one behind
+    assert sanitizer.sanitize_query("open javajavascript:script:x") == "open x"
+    assert sanitizer.sanitize_query("show\tdisk   usage") == "showdisk usage"
+
+    with pytest.raises(ValueError, match="empty"):
+        sanitizer.sanitize_query("   ")
+
+
+def test_sanitize_command_normalizes_whitespace_per_line():
+    """Test commands keep their lines but collapse spaces and tabs within them."""
+    sanitizer = InputSanitizer()
+
+    assert sanitizer.sanitize_command(" ls   -la\t /tmp \n  df\x07 -h ") == "ls -la /tmp\ndf -h"
+
+    with pytest.raises(ValueError, match="too long"):
+        sanitizer.sanitize_command("x" * (InputSanitizer.MAX_COMMAND_LENGTH + 1))
+
+
+def test_sanitize_path_blocks_traversal(tmp_path, monkeypatch):
+    """Test path traversal patterns are rejected and paths normalized without resolving symlinks."""
+    sanitizer = InputSanitizer()
+    (tmp_path / "link").symlink_to("/etc")
+    monkeypatch.chdir(tmp_path)
+
+    assert sanitizer.sanitize_path("   ") is None
+    assert sanitizer.sanitize_path("/etc/hosts") == "/etc/hosts"
+    assert sanitizer.sanitize_path("link/./hosts/") == str(tmp_path / "link" / "hosts")
+    for path in ["../etc/passwd", "..\\windows", "//etc", "~/secrets"]:
+        with pytest.raises(ValueError, match="dangerous pattern"):
+            sanitizer.sanitize_path(path)
+
+
+def test_sanitize_config_value_validates_urls():
+    """Test URL config values must use http or https."""
+    sanitizer = InputSanitizer()
+
+    assert sanitizer.sanitize_config_value(" HTTPS://example.com ", "url") == "HTTPS://example.com"
+    assert sanitizer.sanitize_config_value("0.5", "number") == "0.5"
+    with pytest.raises(ValueError, match="URL must start"):
+        sanitizer.sanitize_config_value("ftp://example.com", "url")
+
+
+def test_sanitize_ai_response_keeps_newlines_and_truncates():
+    """Test AI responses keep newlines and tabs, and are limited in length."""
+    sanitizer = InputSanitizer()
+
+    assert sanitizer.sanitize_ai_response("a\x00b\n\tc\x1b") == "ab\n\tc"
+    assert len(sanitizer.sanitize_ai_response("x" * (InputSanitizer.MAX_INPUT_LENGTH * 3))) == (
+        InputSanitizer.MAX_INPUT_LENGTH * 2
+    )
+    assert sanitizer.sanitize_ai_response(None) == ""